@@ -13,8 +13,6 @@ from src.ingest.pages import organize_all
 
 logger = get_logger("data_main")
 
-CHARS_PER_TOKEN = 4
-
 
 @dataclass(frozen=True)
 class PipelinePaths:
@@ -24,30 +22,14 @@ class PipelinePaths:
     chunks_dir: Path = Path("data/chunks")
 
 
-def _chunking_params(cfg: AppConfig) -> dict[str, int]:
-    max_chars = cfg.chunking.max_tokens * CHARS_PER_TOKEN
-    overlap_chars = cfg.chunking.overlap_tokens * CHARS_PER_TOKEN
-    min_chunk_chars = cfg.chunking.min_tokens * CHARS_PER_TOKEN
-
-    if min_chunk_chars > max_chars:
-        raise ValueError(
-            "Invalid chunking config: min_tokens must be <= max_tokens "
-            f"(got {cfg.chunking.min_tokens} > {cfg.chunking.max_tokens})"
-        )
-
-    return {
-        "max_chars": max_chars,
-        "overlap_chars": overlap_chars,
-        "min_chunk_chars": min_chunk_chars,
-    }
-
-
-def run_pipeline(cfg: AppConfig, run_id: str, paths: PipelinePaths) -> None:
-    chunking = _chunking_params(cfg)
-
+def run_pipeline(cfg: AppConfig, run_id: str, paths: PipelinePaths) -> dict[str, dict[str, int]]:
+    """Run fetch -> organize -> chunk in-process and return each stage's summary."""
     logger.info(
-        f"run_id={run_id} stage=start project={cfg.project.name} "
-        f"seed_urls={len(cfg.sources.seed_urls)} chunk_method={cfg.chunking.method}"
+        "run_id=%s stage=start project=%s seed_urls=%d chunk_method=%s",
+        run_id,
+        cfg.project.name,
+        len(cfg.sources.seed_urls),
+        cfg.chunking.method,
     )
 
     fetch_summary = fetch_seed_urls(
@@ -55,26 +37,33 @@ def run_pipeline(cfg: AppConfig, run_id: str, paths: PipelinePaths) -> None:
         out_raw_dir=paths.raw_dir,
         run_id=run_id,
     )
-    logger.info(f"run_id={run_id} stage=fetch_done summary={fetch_summary}")
+    logger.info("run_id=%s stage=fetch_done summary=%s", run_id, fetch_summary)
 
     organize_summary = organize_all(
         raw_dir=paths.raw_dir,
         processed_dir=paths.processed_dir,
         organized_dir=paths.organized_dir,
     )
-    logger.info(f"run_id={run_id} stage=organize_done summary={organize_summary}")
+    logger.info("run_id=%s stage=organize_done summary=%s", run_id, organize_summary)
 
     chunk_summary = chunk_all(
         organized_index=paths.organized_dir / "docs.jsonl",
         processed_dir=paths.processed_dir,
         out_dir=paths.chunks_dir,
-        max_chars=chunking["max_chars"],
-        overlap_chars=chunking["overlap_chars"],
-        min_chunk_chars=chunking["min_chunk_chars"],
+        max_chars=cfg.chunking.max_chars,
+        overlap_chars=cfg.chunking.overlap_chars,
+        min_chunk_chars=cfg.chunking.min_chunk_chars,
+        method=cfg.chunking.method,
     )
-    logger.info(f"run_id={run_id} stage=chunk_done summary={chunk_summary}")
+    logger.info("run_id=%s stage=chunk_done summary=%s", run_id, chunk_summary)
+
+    logger.info("run_id=%s stage=done", run_id)
 
-    logger.info(f"run_id={run_id} stage=done")
+    return {
+        "fetch": fetch_summary,
+        "organize": organize_summary,
+        "chunk": chunk_summary,
+    }
 
 
 def main() -> None:
@@ -11,4 +11,7 @@ export OLLAMA_URL="${OLLAMA_URL:-http://localhost:11434/api/generate}"
 export OLLAMA_MODEL="${OLLAMA_MODEL:-llama3.1}"
 export REQUIRE_API_KEY="${REQUIRE_API_KEY:-false}"
 
-exec uvicorn src.api.main:app --host 0.0.0.0 --port "${PORT:-8000}"
+# uvloop + httptools come with uvicorn[standard]; name them so a missing extra fails fast
+# instead of silently falling back to asyncio + h11.
+exec uvicorn src.api.main:app --host 0.0.0.0 --port "${PORT:-8000}" \
+  --loop uvloop --http httptools --workers "${UVICORN_WORKERS:-1}"
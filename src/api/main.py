@@ -1,56 +1,112 @@
 from __future__ import annotations
 
-import os
-from threading import BoundedSemaphore
-from typing import Any, Dict, List
+import asyncio
+import hashlib
+import json
+import time
+from threading import BoundedSemaphore, Lock
+from typing import Any, Dict, Iterator, List
 
+import httpx
 from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
-from starlette.responses import Response
+from starlette.background import BackgroundTask
+from starlette.responses import Response, StreamingResponse
 
-from src.api.metrics import ANSWER_ATTEMPTS_TOTAL, REQUEST_LATENCY_SECONDS, REQUESTS_TOTAL
+from src.core.batcher import MicroBatcher
+from src.api.metrics import (
+    ANSWER_ATTEMPTS_TOTAL,
+    CACHE_HITS_EXACT,
+    CACHE_HITS_SEMANTIC,
+    CACHE_MISSES_EXACT,
+    CACHE_MISSES_SEMANTIC,
+    LATENCY_ANSWER,
+    LATENCY_STREAM,
+    REQUESTS_ANSWER_200,
+    REQUESTS_ANSWER_401,
+    REQUESTS_ANSWER_429,
+    REQUESTS_ANSWER_500,
+    REQUESTS_ANSWER_503,
+    REQUESTS_STREAM_200,
+    REQUESTS_STREAM_401,
+    REQUESTS_STREAM_429,
+    REQUESTS_STREAM_503,
+)
 from src.api.models import AnswerRequest, AnswerResponse, Citation, Timing
-from src.api.ollama_client import is_model_ready
+from src.api.ollama_client import ais_model_ready
 from src.api.settings import ApiSettings
 from src.core.logging import get_logger
-from src.rag.langchain_rag import LangChainRAG
+from src.rag.cache import LRUCache, SemanticCache, numeric_signature
+from src.rag.langchain_rag import LangChainRAG, LangChainRagResult
 
 logger = get_logger("api")
 
+# /readyz reuses the last Ollama probe for this long instead of calling /api/tags on every hit.
+_OLLAMA_PROBE_TTL_SECONDS = 5.0
 
-def _parse_csv(value: str) -> List[str]:
-    parts = [p.strip() for p in value.split(",")]
-    return [p for p in parts if p]
-
-
-def _load_settings() -> ApiSettings:
-    cors_raw = os.getenv("CORS_ALLOW_ORIGINS", "")
-    cors_allow_origins: List[str] = []
-    if cors_raw:
-        cors_allow_origins = _parse_csv(cors_raw)
-
-    return ApiSettings(
-        config_path=os.getenv("RAG_CONFIG_PATH", "config.yaml"),
-        chunks_path=os.getenv("RAG_CHUNKS_PATH", "data/chunks/chunks.jsonl"),
-        index_path=os.getenv("RAG_INDEX_PATH", "artifacts/index/index.faiss"),
-        meta_path=os.getenv("RAG_META_PATH", "artifacts/index/meta.jsonl"),
-        ollama_url=os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate"),
-        ollama_model=os.getenv("OLLAMA_MODEL", "llama3.1"),
-        ollama_timeout_seconds=int(os.getenv("OLLAMA_TIMEOUT_SECONDS", "180")),
-        api_key=os.getenv("API_KEY") or None,
-        require_api_key=os.getenv("REQUIRE_API_KEY", "true").lower() in {"1", "true", "yes"},
-        cors_allow_origins=cors_allow_origins,
-        allow_insecure_cors_wildcard=os.getenv("ALLOW_INSECURE_CORS_WILDCARD", "false").lower()
-        in {"1", "true", "yes"},
-        max_concurrent_requests=int(os.getenv("MAX_CONCURRENT_REQUESTS", "16")),
-        disable_generation=os.getenv("RAG_DISABLE_GENERATION", "false").lower() in {"1", "true", "yes"},
-        log_level=os.getenv("LOG_LEVEL", "INFO"),
+
+def _build_response(result: LangChainRagResult, *, top_k: int) -> AnswerResponse:
+    mode = result.mode
+    # Built from in-process engine output, so skip field validation here;
+    # FastAPI still checks /answer responses against response_model.
+    citations: List[Citation] = [
+        Citation.model_construct(
+            cite=c.cite,
+            score=c.score,
+            chunk_id=c.chunk_id,
+            doc_id=c.doc_id,
+            url=c.url,
+            start_char=c.start_char,
+            end_char=c.end_char,
+            retrieval_mode=mode,
+            dense_score=c.dense_score,
+            bm25_score=c.bm25_score,
+            coverage=c.coverage,
+        )
+        for c in result.citations
+    ]
+
+    return AnswerResponse.model_construct(
+        answer=result.answer,
+        citations=citations,
+        retrieval={
+            "mode": result.mode,
+            "should_answer": result.should_answer,
+            "reason": result.reason,
+            "top_k": top_k,
+        },
+        timing=Timing.model_construct(
+            retrieval_seconds=result.retrieval_seconds,
+            generation_seconds=result.generation_seconds,
+            total_seconds=result.total_seconds,
+        ),
+    )
+
+
+def _exact_cache_key(question: str, top_k: int) -> bytes:
+    # Fixed-size digest so long questions don't bloat the cache keys.
+    return hashlib.blake2b(f"{question}|{top_k}".encode("utf-8"), digest_size=16).digest()
+
+
+def _served_from_cache(response: AnswerResponse, t0: float) -> AnswerResponse:
+    return response.model_copy(
+        update={
+            "timing": Timing.model_construct(
+                retrieval_seconds=0.0,
+                generation_seconds=0.0,
+                total_seconds=time.perf_counter() - t0,
+            )
+        }
     )
 
 
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
 def create_app() -> FastAPI:
-    settings = _load_settings()
+    settings = ApiSettings()
     request_slots = BoundedSemaphore(value=settings.max_concurrent_requests)
 
     application = FastAPI(title="Tx_Snap_RAG API", version="0.2.0")
@@ -69,6 +125,12 @@ def create_app() -> FastAPI:
         logger.setLevel(settings.log_level)
         application.state.settings = settings
         application.state.startup_error = None
+        application.state.retrieval_batcher = None
+        application.state.semantic_cache = None
+        application.state.exact_cache = None
+        application.state.ollama_last_check = (0.0, False, "unknown")
+        # One pooled client for /readyz probes, closed on shutdown.
+        application.state.ollama_client = httpx.AsyncClient(timeout=2)
         try:
             if settings.require_api_key and not settings.api_key:
                 raise RuntimeError("API_KEY is required when REQUIRE_API_KEY=true.")
@@ -76,7 +138,7 @@ def create_app() -> FastAPI:
                 raise RuntimeError(
                     "Wildcard CORS is disabled. Set explicit origins or ALLOW_INSECURE_CORS_WILDCARD=true."
                 )
-            application.state.rag_engine = LangChainRAG(
+            rag_engine = LangChainRAG(
                 config_path=settings.config_path,
                 chunks_path=settings.chunks_path,
                 index_path=settings.index_path,
@@ -84,19 +146,61 @@ def create_app() -> FastAPI:
                 ollama_url=settings.ollama_url,
                 ollama_model=settings.ollama_model,
                 disable_generation=settings.disable_generation,
+                dense_workers=settings.max_concurrent_requests,
             )
+            application.state.rag_engine = rag_engine
+            # Concurrent requests share one query-embedding call and one FAISS search.
+            # BM25-only retrieval has nothing to amortize, so it stays per request.
+            if rag_engine.hybrid_enabled and settings.retrieval_batch_size > 1:
+                application.state.retrieval_batcher = MicroBatcher(
+                    rag_engine.retrieve_many,
+                    max_batch_size=settings.retrieval_batch_size,
+                    max_wait_seconds=settings.retrieval_batch_wait_ms / 1000.0,
+                    name="retrieval-batcher",
+                )
+            if settings.exact_cache_enabled:
+                application.state.exact_cache = LRUCache(
+                    maxsize=settings.exact_cache_max_entries,
+                    ttl_seconds=settings.exact_cache_ttl_seconds,
+                )
+            # Opt-in: paraphrased repeats are answered from cache; needs the dense embedder.
+            if rag_engine.hybrid_enabled and settings.semantic_cache_enabled:
+                application.state.semantic_cache = SemanticCache(
+                    dim=rag_engine.vector_store.index.d,
+                    threshold=settings.semantic_cache_threshold,
+                    max_entries=settings.semantic_cache_max_entries,
+                    ttl_seconds=settings.semantic_cache_ttl_seconds,
+                )
+            if settings.warmup_on_startup:
+                try:
+                    rag_engine.warmup()
+                except Exception as e:
+                    logger.warning("warmup_failed error=%s", e)
             logger.info("startup_complete")
         except Exception as e:
             application.state.startup_error = str(e)
             application.state.rag_engine = None
-            logger.exception(f"startup_failed error={e}")
+            logger.exception("startup_failed error=%s", e)
+
+    @application.on_event("shutdown")
+    async def _shutdown() -> None:
+        batcher: MicroBatcher | None = getattr(application.state, "retrieval_batcher", None)
+        if batcher is not None:
+            batcher.close()
+        rag_engine: LangChainRAG | None = getattr(application.state, "rag_engine", None)
+        if rag_engine is not None:
+            rag_engine.close()
+        ollama_client: httpx.AsyncClient | None = getattr(application.state, "ollama_client", None)
+        if ollama_client is not None:
+            await ollama_client.aclose()
+            application.state.ollama_client = None
 
     @application.get("/healthz")
     def healthz() -> Dict[str, str]:
         return {"status": "ok"}
 
     @application.get("/readyz")
-    def readyz() -> Dict[str, Any]:
+    async def readyz() -> Dict[str, Any]:
         startup_error: str | None = application.state.startup_error
         rag_engine: LangChainRAG | None = application.state.rag_engine
         if startup_error:
@@ -112,11 +216,16 @@ def create_app() -> FastAPI:
 
         ollama_ok, ollama_detail = (True, "generation_disabled")
         if not settings.disable_generation:
-            ollama_ok, ollama_detail = is_model_ready(
-                url=settings.ollama_url,
-                model=settings.ollama_model,
-                timeout_seconds=2,
-            )
+            now = time.monotonic()
+            checked_at, ollama_ok, ollama_detail = application.state.ollama_last_check
+            if not checked_at or now - checked_at > _OLLAMA_PROBE_TTL_SECONDS:
+                ollama_ok, ollama_detail = await ais_model_ready(
+                    url=settings.ollama_url,
+                    model=settings.ollama_model,
+                    timeout_seconds=2,
+                    client=getattr(application.state, "ollama_client", None),
+                )
+                application.state.ollama_last_check = (now, ollama_ok, ollama_detail)
 
         return {
             "ready": ollama_ok,
@@ -134,6 +243,9 @@ def create_app() -> FastAPI:
             "ollama_status": ollama_detail,
             "require_api_key": settings.require_api_key,
             "max_concurrent_requests": settings.max_concurrent_requests,
+            "retrieval_batching": application.state.retrieval_batcher is not None,
+            "exact_cache": application.state.exact_cache is not None,
+            "semantic_cache": application.state.semantic_cache is not None,
         }
 
     @application.get("/metrics")
@@ -141,77 +253,144 @@ def create_app() -> FastAPI:
         data = generate_latest()
         return Response(content=data, media_type=CONTENT_TYPE_LATEST)
 
-    @application.post("/answer", response_model=AnswerResponse)
-    def answer(
-        req: AnswerRequest,
-        x_api_key: str | None = Header(default=None, alias="X-API-Key"),
-    ) -> AnswerResponse:
+    def _admit(x_api_key: str | None, *, unauthorized: Any, unavailable: Any) -> LangChainRAG:
         startup_error: str | None = application.state.startup_error
         if startup_error:
-            REQUESTS_TOTAL.labels(endpoint="/answer", status="503").inc()
+            unavailable.inc()
             raise HTTPException(status_code=503, detail=f"Service is not ready: {startup_error}")
 
         if settings.require_api_key and settings.api_key and x_api_key != settings.api_key:
-            REQUESTS_TOTAL.labels(endpoint="/answer", status="401").inc()
+            unauthorized.inc()
             raise HTTPException(status_code=401, detail="Unauthorized")
 
         rag_engine: LangChainRAG | None = application.state.rag_engine
         if rag_engine is None:
-            REQUESTS_TOTAL.labels(endpoint="/answer", status="503").inc()
+            unavailable.inc()
             raise HTTPException(status_code=503, detail="Service is not ready: RAG engine is not initialized.")
+        return rag_engine
+
+    def _batched_retrieve() -> Any:
+        batcher: MicroBatcher | None = application.state.retrieval_batcher
+        return (lambda q, k: batcher.submit((q, k))) if batcher is not None else None
+
+    @application.post("/answer", response_model=AnswerResponse)
+    async def answer(
+        req: AnswerRequest,
+        x_api_key: str | None = Header(default=None, alias="X-API-Key"),
+    ) -> AnswerResponse:
+        rag_engine = _admit(x_api_key, unauthorized=REQUESTS_ANSWER_401, unavailable=REQUESTS_ANSWER_503)
 
         acquired = request_slots.acquire(blocking=False)
         if not acquired:
-            REQUESTS_TOTAL.labels(endpoint="/answer", status="429").inc()
+            REQUESTS_ANSWER_429.inc()
             raise HTTPException(status_code=429, detail="Server is busy. Please retry.")
 
         try:
-            with REQUEST_LATENCY_SECONDS.labels(endpoint="/answer").time():
-                result = rag_engine.answer(req.question, top_k=req.top_k)
+            with LATENCY_ANSWER.time():
+                t0 = time.perf_counter()
+                top_k = req.top_k or rag_engine.cfg.retrieval.top_k
+
+                exact_cache: LRUCache[AnswerResponse] | None = application.state.exact_cache
+                exact_key = _exact_cache_key(req.question, top_k)
+                if exact_cache is not None:
+                    cached = exact_cache.get(exact_key)
+                    if cached is not None:
+                        CACHE_HITS_EXACT.inc()
+                        REQUESTS_ANSWER_200.inc()
+                        return _served_from_cache(cached, t0)
+                    CACHE_MISSES_EXACT.inc()
+
+                cache: SemanticCache | None = application.state.semantic_cache
+                query_vector = None
+                if cache is not None:
+                    try:
+                        # Memoized by the engine, so the dense search below reuses this embedding.
+                        query_vector = (await asyncio.to_thread(rag_engine.embed_queries, [req.question]))[0]
+                    except Exception:
+                        query_vector = None
+                    semantic_tag = (top_k, numeric_signature(req.question))
+                    cached = cache.get(query_vector, tag=semantic_tag) if query_vector is not None else None
+                    if cached is not None:
+                        CACHE_HITS_SEMANTIC.inc()
+                        REQUESTS_ANSWER_200.inc()
+                        if exact_cache is not None:
+                            exact_cache.put(exact_key, cached)
+                        return _served_from_cache(cached, t0)
+                    CACHE_MISSES_SEMANTIC.inc()
+
+                result = await rag_engine.aanswer(req.question, top_k=req.top_k, retrieve=_batched_retrieve())
 
                 ANSWER_ATTEMPTS_TOTAL.labels(
                     retrieval_mode=result.mode,
                     should_answer=str(result.should_answer).lower(),
                 ).inc()
 
-                citations: List[Citation] = []
-                for c in result.citations:
-                    md = c.metadata or {}
-                    citations.append(
-                        Citation(
-                            cite=c.cite,
-                            score=c.score,
-                            chunk_id=c.chunk_id,
-                            doc_id=md.get("doc_id"),
-                            url=md.get("url"),
-                            start_char=md.get("start_char"),
-                            end_char=md.get("end_char"),
-                            retrieval_mode=result.mode,
-                            dense_score=c.dense_score,
-                            bm25_score=c.bm25_score,
-                            coverage=c.coverage,
-                        )
-                    )
-
-                REQUESTS_TOTAL.labels(endpoint="/answer", status="200").inc()
-                return AnswerResponse(
-                    answer=result.answer,
-                    citations=citations,
-                    retrieval={
-                        "mode": result.mode,
-                        "should_answer": result.should_answer,
-                        "reason": result.reason,
-                        "top_k": req.top_k or rag_engine.cfg.retrieval.top_k,
-                    },
-                    timing=Timing(
-                        retrieval_seconds=result.retrieval_seconds,
-                        generation_seconds=result.generation_seconds,
-                        total_seconds=result.total_seconds,
-                    ),
-                )
+                response = _build_response(result, top_k=top_k)
+                if result.should_answer:
+                    if exact_cache is not None:
+                        exact_cache.put(exact_key, response)
+                    if cache is not None and query_vector is not None:
+                        cache.put(query_vector, response, tag=semantic_tag)
+
+                REQUESTS_ANSWER_200.inc()
+                return response
+        except Exception:
+            REQUESTS_ANSWER_500.inc()
+            raise
         finally:
             request_slots.release()
 
+    @application.post("/answer/stream")
+    def answer_stream(
+        req: AnswerRequest,
+        x_api_key: str | None = Header(default=None, alias="X-API-Key"),
+    ) -> StreamingResponse:
+        """Server-sent events: `token` frames with answer text, then one `citations` frame
+        carrying the same body `/answer` returns."""
+        rag_engine = _admit(x_api_key, unauthorized=REQUESTS_STREAM_401, unavailable=REQUESTS_STREAM_503)
+
+        acquired = request_slots.acquire(blocking=False)
+        if not acquired:
+            REQUESTS_STREAM_429.inc()
+            raise HTTPException(status_code=429, detail="Server is busy. Please retry.")
+
+        # The slot is held for the whole stream. Release from the generator when it
+        # finishes or is closed, and from a background task in case it never starts.
+        release_lock = Lock()
+        held = [True]
+
+        def release_slot() -> None:
+            with release_lock:
+                if held[0]:
+                    held[0] = False
+                    request_slots.release()
+
+        retrieve = _batched_retrieve()
+        top_k = req.top_k or rag_engine.cfg.retrieval.top_k
+
+        def events() -> Iterator[str]:
+            try:
+                with LATENCY_STREAM.time():
+                    for item in rag_engine.answer_stream(req.question, top_k=req.top_k, retrieve=retrieve):
+                        if isinstance(item, str):
+                            yield _sse("token", json.dumps(item))
+                            continue
+                        ANSWER_ATTEMPTS_TOTAL.labels(
+                            retrieval_mode=item.mode,
+                            should_answer=str(item.should_answer).lower(),
+                        ).inc()
+                        yield _sse("citations", _build_response(item, top_k=top_k).model_dump_json())
+            finally:
+                release_slot()
+
+        REQUESTS_STREAM_200.inc()
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+            background=BackgroundTask(release_slot),
+        )
+
     return application
 
 
@@ -21,3 +21,35 @@ REQUEST_LATENCY_SECONDS = Histogram(
     ["endpoint"],
 )
 
+
+CACHE_HITS_TOTAL = Counter(
+    "tx_snap_rag_cache_hits_total",
+    "Answer cache hits.",
+    ["cache"],
+)
+
+CACHE_MISSES_TOTAL = Counter(
+    "tx_snap_rag_cache_misses_total",
+    "Answer cache misses.",
+    ["cache"],
+)
+
+
+# Pre-bound children: hot paths call .inc()/.time() without resolving labels per request.
+REQUESTS_ANSWER_200 = REQUESTS_TOTAL.labels(endpoint="/answer", status="200")
+REQUESTS_ANSWER_401 = REQUESTS_TOTAL.labels(endpoint="/answer", status="401")
+REQUESTS_ANSWER_429 = REQUESTS_TOTAL.labels(endpoint="/answer", status="429")
+REQUESTS_ANSWER_500 = REQUESTS_TOTAL.labels(endpoint="/answer", status="500")
+REQUESTS_ANSWER_503 = REQUESTS_TOTAL.labels(endpoint="/answer", status="503")
+LATENCY_ANSWER = REQUEST_LATENCY_SECONDS.labels(endpoint="/answer")
+
+REQUESTS_STREAM_200 = REQUESTS_TOTAL.labels(endpoint="/answer/stream", status="200")
+REQUESTS_STREAM_401 = REQUESTS_TOTAL.labels(endpoint="/answer/stream", status="401")
+REQUESTS_STREAM_429 = REQUESTS_TOTAL.labels(endpoint="/answer/stream", status="429")
+REQUESTS_STREAM_503 = REQUESTS_TOTAL.labels(endpoint="/answer/stream", status="503")
+LATENCY_STREAM = REQUEST_LATENCY_SECONDS.labels(endpoint="/answer/stream")
+
+CACHE_HITS_EXACT = CACHE_HITS_TOTAL.labels(cache="exact")
+CACHE_MISSES_EXACT = CACHE_MISSES_TOTAL.labels(cache="exact")
+CACHE_HITS_SEMANTIC = CACHE_HITS_TOTAL.labels(cache="semantic")
+CACHE_MISSES_SEMANTIC = CACHE_MISSES_TOTAL.labels(cache="semantic")
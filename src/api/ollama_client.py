@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from urllib.parse import urlparse, urlunparse
 
+import httpx
 import requests
 
 
@@ -19,18 +20,12 @@ def generate(
     return (data.get("response") or "").strip()
 
 
-def is_model_ready(*, url: str, model: str, timeout_seconds: int = 2) -> tuple[bool, str]:
-    """Check whether Ollama is reachable and the configured model is available."""
+def _tags_url(url: str) -> str:
     parsed = urlparse(url)
-    tags_url = urlunparse(parsed._replace(path="/api/tags", params="", query="", fragment=""))
+    return urlunparse(parsed._replace(path="/api/tags", params="", query="", fragment=""))
 
-    try:
-        response = requests.get(tags_url, timeout=timeout_seconds)
-        response.raise_for_status()
-        payload = response.json()
-    except Exception as exc:  # pragma: no cover - network condition
-        return False, f"ollama_unreachable: {exc}"
 
+def _model_status(payload: dict, model: str) -> tuple[bool, str]:
     models = payload.get("models") or []
     names = [str(item.get("name", "")).strip() for item in models]
 
@@ -42,3 +37,37 @@ def is_model_ready(*, url: str, model: str, timeout_seconds: int = 2) -> tuple[b
     if not found:
         return False, f"model_not_downloaded: {model}"
     return True, "ok"
+
+
+def is_model_ready(*, url: str, model: str, timeout_seconds: int = 2) -> tuple[bool, str]:
+    """Check whether Ollama is reachable and the configured model is available."""
+    try:
+        response = requests.get(_tags_url(url), timeout=timeout_seconds)
+        response.raise_for_status()
+        payload = response.json()
+    except Exception as exc:  # pragma: no cover - network condition
+        return False, f"ollama_unreachable: {exc}"
+
+    return _model_status(payload, model)
+
+
+async def ais_model_ready(
+    *,
+    url: str,
+    model: str,
+    timeout_seconds: int = 2,
+    client: httpx.AsyncClient | None = None,
+) -> tuple[bool, str]:
+    """Async variant of `is_model_ready` for use inside the event loop."""
+    try:
+        if client is None:
+            async with httpx.AsyncClient(timeout=timeout_seconds) as owned:
+                response = await owned.get(_tags_url(url))
+        else:
+            response = await client.get(_tags_url(url), timeout=timeout_seconds)
+        response.raise_for_status()
+        payload = response.json()
+    except Exception as exc:  # pragma: no cover - network condition
+        return False, f"ollama_unreachable: {exc}"
+
+    return _model_status(payload, model)
@@ -1,31 +1,82 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Annotated, Any, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
-class ApiSettings(BaseModel):
+class ApiSettings(BaseSettings):
+    """Serving settings, read once from the environment with typed validation."""
+
+    model_config = SettingsConfigDict(env_prefix="", extra="ignore", populate_by_name=True)
+
     # Paths
-    config_path: str = Field(default="config.yaml")
-    chunks_path: str = Field(default="data/chunks/chunks.jsonl")
-    index_path: str = Field(default="artifacts/index/index.faiss")
-    meta_path: str = Field(default="artifacts/index/meta.jsonl")
+    config_path: str = Field(default="config.yaml", validation_alias="RAG_CONFIG_PATH")
+    chunks_path: str = Field(default="data/chunks/chunks.jsonl", validation_alias="RAG_CHUNKS_PATH")
+    index_path: str = Field(default="artifacts/index/index.faiss", validation_alias="RAG_INDEX_PATH")
+    meta_path: str = Field(default="artifacts/index/meta.jsonl", validation_alias="RAG_META_PATH")
 
     # Ollama
-    ollama_url: str = Field(default="http://localhost:11434/api/generate")
-    ollama_model: str = Field(default="llama3.1")
-    ollama_timeout_seconds: int = Field(default=180, gt=0)
+    ollama_url: str = Field(default="http://localhost:11434/api/generate", validation_alias="OLLAMA_URL")
+    ollama_model: str = Field(default="llama3.1", validation_alias="OLLAMA_MODEL")
+    ollama_timeout_seconds: int = Field(default=180, gt=0, validation_alias="OLLAMA_TIMEOUT_SECONDS")
 
     # Public API controls
-    api_key: Optional[str] = Field(default=None)
-    require_api_key: bool = Field(default=True)
-    cors_allow_origins: List[str] = Field(default_factory=list)
-    allow_insecure_cors_wildcard: bool = Field(default=False)
-    max_concurrent_requests: int = Field(default=16, gt=0)
+    api_key: Optional[str] = Field(default=None, validation_alias="API_KEY")
+    require_api_key: bool = Field(default=True, validation_alias="REQUIRE_API_KEY")
+    cors_allow_origins: Annotated[List[str], NoDecode] = Field(
+        default_factory=list, validation_alias="CORS_ALLOW_ORIGINS"
+    )
+    allow_insecure_cors_wildcard: bool = Field(default=False, validation_alias="ALLOW_INSECURE_CORS_WILDCARD")
+    max_concurrent_requests: int = Field(default=16, gt=0, validation_alias="MAX_CONCURRENT_REQUESTS")
 
     # Serving behavior
-    disable_generation: bool = Field(default=False)
+    disable_generation: bool = Field(default=False, validation_alias="RAG_DISABLE_GENERATION")
+    retrieval_batch_size: int = Field(default=8, gt=0, validation_alias="RAG_RETRIEVAL_BATCH_SIZE")
+    retrieval_batch_wait_ms: float = Field(default=5.0, ge=0, validation_alias="RAG_RETRIEVAL_BATCH_WAIT_MS")
+    exact_cache_enabled: bool = Field(default=True, validation_alias="RAG_EXACT_CACHE")
+    exact_cache_max_entries: int = Field(default=2048, gt=0, validation_alias="RAG_EXACT_CACHE_MAX_ENTRIES")
+    exact_cache_ttl_seconds: float = Field(default=600.0, gt=0, validation_alias="RAG_EXACT_CACHE_TTL_SECONDS")
+    # Off by default: a false hit answers a different question (see SemanticCacheConfig).
+    semantic_cache_enabled: bool = Field(default=False, validation_alias="RAG_SEMANTIC_CACHE")
+    semantic_cache_threshold: float = Field(
+        default=0.95, gt=0.0, le=1.0, validation_alias="RAG_SEMANTIC_CACHE_THRESHOLD"
+    )
+    semantic_cache_max_entries: int = Field(default=1024, gt=0, validation_alias="RAG_SEMANTIC_CACHE_MAX_ENTRIES")
+    semantic_cache_ttl_seconds: float = Field(
+        default=600.0, gt=0, validation_alias="RAG_SEMANTIC_CACHE_TTL_SECONDS"
+    )
+    warmup_on_startup: bool = Field(default=True, validation_alias="RAG_WARMUP")
 
     # Operational
-    log_level: str = Field(default="INFO")
+    log_level: str = Field(default="INFO", validation_alias="LOG_LEVEL")
+
+    @field_validator("api_key", mode="before")
+    @classmethod
+    def _empty_api_key_is_unset(cls, value: Any) -> Any:
+        return value or None
+
+    @field_validator(
+        "require_api_key",
+        "allow_insecure_cors_wildcard",
+        "disable_generation",
+        "exact_cache_enabled",
+        "semantic_cache_enabled",
+        "warmup_on_startup",
+        mode="before",
+    )
+    @classmethod
+    def _lenient_bool(cls, value: Any) -> Any:
+        # Same as the old os.getenv parsing: only 1/true/yes are true, anything else
+        # (including an empty variable) is false rather than a startup error.
+        if isinstance(value, str):
+            return value.strip().lower() in {"1", "true", "yes"}
+        return value
+
+    @field_validator("cors_allow_origins", mode="before")
+    @classmethod
+    def _split_csv(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return [s for s in (p.strip() for p in value.split(",")) if s]
+        return value
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Generic, List, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_STOP = object()
+
+
+class MicroBatcher(Generic[T, R]):
+    """Group items submitted from many threads into one call to `fn`.
+
+    A single worker thread takes the first queued item, then keeps collecting until
+    `max_batch_size` items are queued or `max_wait_seconds` has passed, and hands the
+    batch to `fn`. `fn` must return one result per item, in order.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[T]], Sequence[R]],
+        *,
+        max_batch_size: int = 8,
+        max_wait_seconds: float = 0.005,
+        name: str = "micro-batcher",
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be > 0")
+        self._fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max(max_wait_seconds, 0.0)
+        self._queue: "queue.Queue[object]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: T) -> R:
+        """Queue one item and block until its batch has been processed."""
+        future: Future[R] = Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stopping = True
+                    break
+                batch.append(nxt)
+
+            self._dispatch(batch)  # type: ignore[arg-type]
+            if stopping:
+                return
+
+    def _dispatch(self, batch: List[tuple[T, Future[R]]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = self._fn(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"batch_result_size_mismatch(expected={len(items)}, got={len(results)})")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
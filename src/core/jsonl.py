@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import mmap
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse one JSON document, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize one JSON document to compact UTF-8 bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_jsonl(path: str | Path, rows: Iterable[Dict[str, Any]]) -> int:
+    """Write rows as JSONL (creating parent dirs) and return how many were written."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with path.open("wb") as f:
+        for row in rows:
+            f.write(dumps(row))
+            f.write(b"\n")
+            n += 1
+    return n
+
+
+def iter_jsonl(path: str | Path, *, missing_ok: bool = False) -> Iterator[Dict[str, Any]]:
+    """Stream rows from a JSONL file without materializing the whole file.
+
+    The file is memory-mapped and each line is handed to the parser as a
+    memoryview slice, so lines are never copied into new bytes objects when
+    orjson is available. Blank lines are skipped. With `missing_ok`, a missing
+    file yields no rows.
+    """
+    path = Path(path)
+    if missing_ok and not path.exists():
+        return
+    with path.open("rb") as f:
+        if path.stat().st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                size = len(mm)
+                pos = 0
+                line_no = 0
+                while pos < size:
+                    nl = mm.find(b"\n", pos)
+                    end = size if nl < 0 else nl
+                    line_no += 1
+                    line = view[pos:end]
+                    pos = end + 1
+                    try:
+                        try:
+                            row = loads(line if orjson is not None else bytes(line))
+                        except ValueError as e:
+                            # Blank (whitespace-only) lines only cost a copy on this slow path.
+                            if not bytes(line).strip():
+                                continue
+                            raise ValueError(f"Invalid JSON on line {line_no} in {path}: {e}") from e
+                        yield row
+                    finally:
+                        line.release()
+            finally:
+                view.release()
@@ -1,8 +1,100 @@
 from __future__ import annotations
 
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import multiprocessing
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Dict
+
+# One queue + listener per log file. Callers only enqueue records; formatting the line
+# and writing to stderr / disk happens on the listener's background thread.
+_QUEUE_HANDLERS: Dict[Path, QueueHandler] = {}
+_LISTENERS: list[QueueListener] = []
+_LOCK = threading.Lock()
+# Worker processes log straight to the file instead: a forked child inherits the queue
+# but not the listener thread, so anything it enqueued would never be written.
+_DIRECT_HANDLERS: Dict[Path, list[logging.Handler]] = {}
+
+_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+
+def _stop_listeners() -> None:
+    for listener in _LISTENERS:
+        listener.stop()
+    _LISTENERS.clear()
+
+
+def _queue_handler(log_path: Path) -> QueueHandler:
+    with _LOCK:
+        handler = _QUEUE_HANDLERS.get(log_path)
+        if handler is not None:
+            return handler
+
+        fmt = logging.Formatter(_FORMAT)
+
+        sh = logging.StreamHandler()
+        sh.setFormatter(fmt)
+
+        fh = RotatingFileHandler(log_path, maxBytes=5_000_000, backupCount=5)
+        fh.setFormatter(fmt)
+
+        q: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        listener = QueueListener(q, sh, fh)
+        listener.start()
+        if not _LISTENERS:
+            atexit.register(_stop_listeners)
+        _LISTENERS.append(listener)
+
+        handler = QueueHandler(q)
+        _QUEUE_HANDLERS[log_path] = handler
+        return handler
+
+
+def _direct_handlers(log_path: Path) -> list[logging.Handler]:
+    with _LOCK:
+        handlers = _DIRECT_HANDLERS.get(log_path)
+        if handlers is not None:
+            return handlers
+
+        fmt = logging.Formatter(_FORMAT)
+        sh = logging.StreamHandler()
+        sh.setFormatter(fmt)
+        # Plain append, no rotation: the parent owns rotating the shared file.
+        fh = logging.FileHandler(log_path, delay=True)
+        fh.setFormatter(fmt)
+
+        handlers = _DIRECT_HANDLERS[log_path] = [sh, fh]
+        return handlers
+
+
+def _reattach_after_fork() -> None:
+    """In a forked child, swap inherited queue handlers for direct ones."""
+    global _LOCK
+    _LOCK = threading.Lock()  # may have been held by another parent thread at fork time
+    paths = {id(handler): path for path, handler in _QUEUE_HANDLERS.items()}
+    _QUEUE_HANDLERS.clear()
+    _LISTENERS.clear()  # their threads did not survive the fork
+    _DIRECT_HANDLERS.clear()
+
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if not isinstance(logger, logging.Logger):
+            continue
+        for handler in list(logger.handlers):
+            path = paths.get(id(handler))
+            if path is None:
+                continue
+            logger.removeHandler(handler)
+            for direct in _direct_handlers(path):
+                logger.addHandler(direct)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reattach_after_fork)
+
 
 def get_logger(
     name: str,
@@ -16,17 +108,14 @@ def get_logger(
     logger.setLevel(level)
 
     Path(log_dir).mkdir(parents=True, exist_ok=True)
-    log_path = Path(log_dir) / "app.log"
-
-    fmt = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
-
-    sh = logging.StreamHandler()
-    sh.setFormatter(fmt)
-    logger.addHandler(sh)
+    log_path = (Path(log_dir) / "app.log").resolve()
 
-    fh = RotatingFileHandler(log_path, maxBytes=5_000_000, backupCount=5)
-    fh.setFormatter(fmt)
-    logger.addHandler(fh)
+    if multiprocessing.parent_process() is not None:
+        # Spawned workers exit without running atexit, so a listener would drop its backlog.
+        for handler in _direct_handlers(log_path):
+            logger.addHandler(handler)
+    else:
+        logger.addHandler(_queue_handler(log_path))
 
     logger.propagate = False
-    return logger
\ No newline at end of file
+    return logger
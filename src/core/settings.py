@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import List, Optional, Literal
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 from pathlib import Path
 import yaml
 
+# LibYAML's C loader is much faster than the pure-Python one; fall back if PyYAML was built without it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 # -----------------------------
 # Project metadata
@@ -33,6 +37,7 @@ class IngestionConfig(BaseModel):
     user_agent: str
     max_pdfs_per_page: int = Field(ge=0)
     max_pdf_mb: int = Field(gt=0)
+    max_concurrency: int = Field(default=8, gt=0, le=64)
 
 
 class PdfConfig(BaseModel):
@@ -43,17 +48,69 @@ class PdfConfig(BaseModel):
 # -----------------------------
 # Chunking / Embedding
 # -----------------------------
+# Rough chars-per-token ratio used to turn token budgets into character limits.
+CHARS_PER_TOKEN = 4
+
+
 class ChunkingConfig(BaseModel):
     method: Literal["fixed", "recursive", "heading"]
     min_tokens: int = Field(gt=0)
     max_tokens: int = Field(gt=0)
     overlap_tokens: int = Field(ge=0)
 
+    @model_validator(mode="after")
+    def _check_bounds(self) -> "ChunkingConfig":
+        if self.min_tokens > self.max_tokens:
+            raise ValueError(
+                "Invalid chunking config: min_tokens must be <= max_tokens "
+                f"(got {self.min_tokens} > {self.max_tokens})"
+            )
+        if self.overlap_tokens >= self.max_tokens:
+            raise ValueError(
+                "Invalid chunking config: overlap_tokens must be < max_tokens "
+                f"(got {self.overlap_tokens} >= {self.max_tokens})"
+            )
+        return self
+
+    @property
+    def max_chars(self) -> int:
+        return self.max_tokens * CHARS_PER_TOKEN
+
+    @property
+    def overlap_chars(self) -> int:
+        return self.overlap_tokens * CHARS_PER_TOKEN
+
+    @property
+    def min_chunk_chars(self) -> int:
+        return self.min_tokens * CHARS_PER_TOKEN
+
 
 class EmbeddingConfig(BaseModel):
     provider: Literal["openai"]
     model: str
     batch_size: int = Field(gt=0)
+    max_concurrency: int = Field(default=4, gt=0)  # embedding requests in flight
+    max_retries: int = Field(default=5, ge=0)  # client-side backoff on 429 / 5xx / connection errors
+
+
+class IndexConfig(BaseModel):
+    # flat: exact IndexFlatIP. ivfpq: IVF coarse lists + 8-bit PQ codes (needs >= 256 vectors to train).
+    # sqfp16: exact scan over fp16 scalar-quantized vectors (half the memory of flat).
+    # sq8: scan over trained 8-bit scalar-quantized vectors (a quarter of flat's memory).
+    # hnsw: HNSW graph over full vectors; sub-linear search, more memory than flat.
+    # auto: flat up to auto_ivfpq_min_vectors, ivfpq above it.
+    type: Literal["flat", "ivfpq", "sqfp16", "sq8", "hnsw", "auto"] = "flat"
+    auto_ivfpq_min_vectors: int = Field(default=50_000, gt=0)
+    nlist: Optional[int] = Field(default=None, gt=0)  # default: 4 * sqrt(n_vectors)
+    pq_m: int = Field(default=32, gt=0)
+    nprobe: Optional[int] = Field(default=None, gt=0)  # default: max(2, nlist // 50)
+    hnsw_m: int = Field(default=32, gt=0)  # graph neighbours per node
+    ef_construction: int = Field(default=200, gt=0)
+    ef_search: int = Field(default=64, gt=0)  # candidate list per query; higher = better recall, slower
+    mmap: bool = True
+    # OpenMP threads FAISS uses for search/build (process-wide). Default: FAISS's own (all cores).
+    omp_threads: Optional[int] = Field(default=None, gt=0)
+    gpu: bool = False  # train IVF-PQ on / search from GPU 0 when faiss-gpu and a device are available
 
 
 # -----------------------------
@@ -71,6 +128,16 @@ class GenerationConfig(BaseModel):
     require_citations: bool = True
 
 
+class SemanticCacheConfig(BaseModel):
+    # Opt-in: a question is answered with an earlier question's answer when their embeddings
+    # are at least `threshold` similar. 0.95 rather than a looser 0.9, since any false hit
+    # returns an answer to a different question.
+    enabled: bool = False
+    threshold: float = Field(default=0.95, gt=0.0, le=1.0)
+    max_entries: int = Field(default=1024, gt=0)
+    ttl_seconds: float = Field(default=3600.0, gt=0)
+
+
 # -----------------------------
 # Root settings object
 # -----------------------------
@@ -81,16 +148,28 @@ class AppConfig(BaseModel):
     pdf: PdfConfig
     chunking: ChunkingConfig
     embedding: EmbeddingConfig
+    index: IndexConfig = Field(default_factory=IndexConfig)
     retrieval: RetrievalConfig
     generation: GenerationConfig
+    semantic_cache: SemanticCacheConfig = Field(default_factory=SemanticCacheConfig)
 
     @classmethod
     def load(cls, path: str | Path) -> "AppConfig":
+        """Load and validate a config file.
+
+        Parsed configs are cached per (path, mtime), so repeated loads of an unchanged
+        file return the same instance. Treat the result as read-only.
+        """
         path = Path(path)
         if not path.exists():
             raise FileNotFoundError(f"Config file not found: {path}")
 
-        with path.open("r", encoding="utf-8") as f:
-            raw = yaml.safe_load(f)
+        return _load_cached(cls, str(path.resolve()), path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _load_cached(cls: type[AppConfig], path: str, mtime_ns: int) -> AppConfig:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.load(f, Loader=_YAML_LOADER)
 
-        return cls.model_validate(raw)
\ No newline at end of file
+    return cls.model_validate(raw)
\ No newline at end of file
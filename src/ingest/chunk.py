@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import re
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List
+from typing import List
 
 from pydantic import BaseModel, Field, HttpUrl
 
+from src.core.jsonl import dumps, iter_jsonl
 from src.core.logging import get_logger
 
 logger = get_logger("ingest.chunk")
@@ -48,54 +49,54 @@ class ChunkRecord(BaseModel):
 # ---------
 
 _SENT_SPLIT = re.compile(r"(?<=[.!?])\s+\n?|\n+")
+# Runs of spaces/tabs other than a lone " ": single spaces between words are left alone,
+# so the substitution only fires where the text actually changes.
+_HSPACE_RUN = re.compile(r"(?: [ \t]|\t)[ \t]*")
+_BLANK_LINES = re.compile(r"\n{3,}")
 
 
 def _utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _read_jsonl(path: Path) -> List[dict]:
-    rows: List[dict] = []
-    if not path.exists():
-        return rows
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rows.append(json.loads(line))
-    return rows
-
-
-def _write_jsonl(path: Path, rows: Iterable[dict]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        for r in rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
-
-
 def _stable_chunk_id(doc_id: str, start: int, end: int) -> str:
     raw = f"{doc_id}:{start}:{end}".encode("utf-8")
     return hashlib.sha256(raw).hexdigest()[:16]
 
 
-def _token_estimate(text: str) -> int:
-    """Fast token approximation. Uses tiktoken if available; otherwise ~4 chars/token heuristic."""
+@lru_cache(maxsize=1)
+def _encoder():
+    """cl100k_base encoder, resolved once; None when tiktoken or its BPE file is unavailable."""
     try:
         import tiktoken  # type: ignore
 
-        enc = tiktoken.get_encoding("cl100k_base")
-        return len(enc.encode(text))
+        return tiktoken.get_encoding("cl100k_base")
     except Exception:
-        # crude but stable for monitoring
-        return max(1, (len(text) + 3) // 4)
+        return None
+
+
+def _heuristic_estimate(text: str) -> int:
+    # crude but stable for monitoring
+    return max(1, (len(text) + 3) // 4)
+
+
+def _token_estimates(texts: List[str]) -> List[int]:
+    """Fast token approximation for a batch of texts. Uses one tiktoken call if available;
+    otherwise ~4 chars/token heuristic."""
+    enc = _encoder()
+    if enc is not None:
+        try:
+            return [len(tokens) for tokens in enc.encode_ordinary_batch(texts)]
+        except Exception:
+            pass
+    return [_heuristic_estimate(t) for t in texts]
 
 
 def _normalize_text(text: str) -> str:
     # collapse excessive whitespace but keep paragraph breaks
     text = text.replace("\r\n", "\n")
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _HSPACE_RUN.sub(" ", text)
+    text = _BLANK_LINES.sub("\n\n", text)
     return text.strip()
 
 
@@ -125,7 +126,7 @@ def chunk_text(
     if not text:
         return []
 
-    paras = [p.strip() for p in text.split("\n\n") if p.strip()]
+    paras = [p for p in map(str.strip, text.split("\n\n")) if p]
     chunks: List[tuple[str, int, int]] = []
 
     cursor = 0
@@ -161,7 +162,7 @@ def chunk_text(
         if len(p) > max_chars:
             flush_buffer()
 
-            sents = [s.strip() for s in _SENT_SPLIT.split(p) if s.strip()]
+            sents = [s for s in map(str.strip, _SENT_SPLIT.split(p)) if s]
             tmp: List[str] = []
             for s in sents:
                 if sum(len(x) + 1 for x in tmp) + len(s) <= max_chars:
@@ -208,6 +209,39 @@ def chunk_text(
     return chunks
 
 
+def chunk_text_fixed(
+    text: str,
+    *,
+    max_chars: int = 1800,
+    overlap_chars: int = 200,
+) -> List[tuple[str, int, int]]:
+    """Fixed-size sliding windows over the normalized text.
+
+    Window starts are computed in closed form (stride = max_chars - overlap_chars)
+    instead of being discovered by scanning, and each window is a single slice.
+    The final window is pinned to the end of the text so it is never shorter than
+    the others.
+
+    Returns list of (chunk_text, start_char, end_char) offsets in the normalized text.
+    """
+
+    text = _normalize_text(text)
+    if not text:
+        return []
+
+    stride = max_chars - overlap_chars
+    if stride <= 0:
+        raise ValueError(f"overlap_chars ({overlap_chars}) must be smaller than max_chars ({max_chars})")
+
+    n = len(text)
+    if n <= max_chars:
+        return [(text, 0, n)]
+
+    starts = list(range(0, n - max_chars, stride))
+    starts.append(n - max_chars)
+    return [(text[s : s + max_chars], s, s + max_chars) for s in starts]
+
+
 # ---------
 # Pipeline stage
 # ---------
@@ -220,8 +254,12 @@ def chunk_all(
     max_chars: int = 1800,
     overlap_chars: int = 200,
     min_chunk_chars: int = 200,
+    method: str = "heading",
 ) -> dict[str, int]:
-    """Read organized docs index + processed text, write chunks JSONL."""
+    """Read organized docs index + processed text, write chunks JSONL.
+
+    method="fixed" uses sliding windows; any other method uses structure-aware chunking.
+    """
 
     organized_index = Path(organized_index)
     processed_dir = Path(processed_dir)
@@ -229,68 +267,77 @@ def chunk_all(
     out_dir.mkdir(parents=True, exist_ok=True)
 
     docs: List[OrganizedDoc] = []
-    for r in _read_jsonl(organized_index):
+    for r in iter_jsonl(organized_index, missing_ok=True):
         try:
             docs.append(OrganizedDoc.model_validate(r))
         except Exception as e:
             logger.warning(f"organized_row_invalid error={e} keys={list(r.keys())}")
 
     logger.info(
-        f"stage=chunk_start docs={len(docs)} max_chars={max_chars} overlap_chars={overlap_chars} min_chunk_chars={min_chunk_chars}"
+        f"stage=chunk_start docs={len(docs)} method={method} max_chars={max_chars} "
+        f"overlap_chars={overlap_chars} min_chunk_chars={min_chunk_chars}"
     )
 
     created_at = _utc_iso()
-    chunk_rows: List[dict] = []
 
     docs_ok = 0
     docs_missing = 0
     chunks_written = 0
 
-    for d in docs:
-        text_path = Path(d.processed_path)
-        if not text_path.is_absolute():
-            text_path = (Path.cwd() / text_path).resolve()
-
-        if not text_path.exists():
-            text_path = processed_dir / f"{d.doc_id}.txt"
-
-        if not text_path.exists():
-            docs_missing += 1
-            logger.warning(f"missing_processed doc_id={d.doc_id} expected={d.processed_path}")
-            continue
-
-        text = text_path.read_text(encoding="utf-8", errors="ignore")
-        pieces = chunk_text(
-            text,
-            max_chars=max_chars,
-            overlap_chars=overlap_chars,
-            min_chunk_chars=min_chunk_chars,
-        )
-
-        if not pieces:
-            logger.info(f"skip_doc_empty doc_id={d.doc_id} path={text_path.name}")
-            continue
+    # Rows are written as each doc is chunked instead of being collected first; the
+    # temp file is swapped in at the end so a failed run leaves the old output intact.
+    out_path = out_dir / "chunks.jsonl"
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with tmp_path.open("wb") as out:
+        for d in docs:
+            text_path = Path(d.processed_path)
+            if not text_path.is_absolute():
+                text_path = (Path.cwd() / text_path).resolve()
+
+            if not text_path.exists():
+                text_path = processed_dir / f"{d.doc_id}.txt"
+
+            if not text_path.exists():
+                docs_missing += 1
+                logger.warning(f"missing_processed doc_id={d.doc_id} expected={d.processed_path}")
+                continue
 
-        for ct, s, e in pieces:
-            rec = ChunkRecord(
-                doc_id=d.doc_id,
-                chunk_id=_stable_chunk_id(d.doc_id, s, e),
-                url=d.url,
-                kind=d.kind,
-                text=ct,
-                start_char=s,
-                end_char=e,
-                token_estimate=_token_estimate(ct),
-                created_at=created_at,
-            )
-            chunk_rows.append(rec.model_dump(mode="json"))
-            chunks_written += 1
-
-        docs_ok += 1
-        logger.info(f"chunked_doc doc_id={d.doc_id} chunks={len(pieces)}")
+            text = text_path.read_text(encoding="utf-8", errors="ignore")
+            if method == "fixed":
+                pieces = chunk_text_fixed(text, max_chars=max_chars, overlap_chars=overlap_chars)
+            else:
+                pieces = chunk_text(
+                    text,
+                    max_chars=max_chars,
+                    overlap_chars=overlap_chars,
+                    min_chunk_chars=min_chunk_chars,
+                )
+
+            if not pieces:
+                logger.info(f"skip_doc_empty doc_id={d.doc_id} path={text_path.name}")
+                continue
 
-    out_path = out_dir / "chunks.jsonl"
-    _write_jsonl(out_path, chunk_rows)
+            estimates = _token_estimates([ct for ct, _s, _e in pieces])
+            for (ct, s, e), token_estimate in zip(pieces, estimates):
+                rec = ChunkRecord(
+                    doc_id=d.doc_id,
+                    chunk_id=_stable_chunk_id(d.doc_id, s, e),
+                    url=d.url,
+                    kind=d.kind,
+                    text=ct,
+                    start_char=s,
+                    end_char=e,
+                    token_estimate=token_estimate,
+                    created_at=created_at,
+                )
+                out.write(dumps(rec.model_dump(mode="json")))
+                out.write(b"\n")
+                chunks_written += 1
+
+            docs_ok += 1
+            logger.info(f"chunked_doc doc_id={d.doc_id} chunks={len(pieces)}")
+
+    tmp_path.replace(out_path)
 
     logger.info(
         f"stage=chunk_done docs_ok={docs_ok} docs_missing={docs_missing} chunks={chunks_written} out={out_path}"
@@ -299,7 +346,7 @@ def chunk_all(
     return {"docs_ok": docs_ok, "docs_missing": docs_missing, "chunks": chunks_written}
 
 
-__all__ = ["CHUNK_MODULE_VERSION", "chunk_all", "chunk_text", "ChunkRecord", "OrganizedDoc"]
+__all__ = ["CHUNK_MODULE_VERSION", "chunk_all", "chunk_text", "chunk_text_fixed", "ChunkRecord", "OrganizedDoc"]
 
 
 if __name__ == "__main__":
@@ -1,20 +1,35 @@
 from __future__ import annotations
 
 import hashlib
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, Literal, Optional
+from typing import Literal, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pydantic import BaseModel, Field, HttpUrl
 
 from src.core.logging import get_logger
 from src.core.context import get_run_id
+from src.core.jsonl import iter_jsonl, write_jsonl
 from src.core.settings import AppConfig
 
 logger = get_logger("ingest.fetch")
 
+_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Transient upstream failures are retried on the shared session with exponential backoff
+# (honouring Retry-After). The final response is still surfaced via raise_for_status.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    raise_on_status=False,
+)
+
 
 class FetchRecord(BaseModel):
     run_id: str
@@ -25,6 +40,9 @@ class FetchRecord(BaseModel):
     bytes: int = Field(ge=0)
     saved_path: str
     fetched_at: str  # ISO 8601
+    # Validators from the response, replayed as a conditional GET on the next refetch.
+    etag: str = ""
+    last_modified: str = ""
 
 
 def _utc_iso() -> str:
@@ -35,29 +53,132 @@ def _stable_id(url: str) -> str:
     return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
 
 
+def _manifest_row(
+    *,
+    run_id: str,
+    doc_id: str,
+    url: str,
+    kind: Literal["html", "pdf"],
+    content_type: str,
+    size: int,
+    saved_path: Path,
+    fetched_at: str,
+    etag: str = "",
+    last_modified: str = "",
+) -> dict:
+    """A FetchRecord-shaped manifest row.
+
+    Built as a plain dict: every field is produced here and seed URLs are already
+    validated by AppConfig. FetchRecord validates rows when the manifest is read back.
+    """
+    return {
+        "run_id": run_id,
+        "doc_id": doc_id,
+        "url": url,
+        "kind": kind,
+        "content_type": content_type,
+        "bytes": size,
+        "saved_path": str(saved_path),
+        "fetched_at": fetched_at,
+        "etag": etag,
+        "last_modified": last_modified,
+    }
+
+
 def _is_pdf(url: str, content_type: Optional[str]) -> bool:
     ct = (content_type or "").lower()
     return url.lower().endswith(".pdf") or "application/pdf" in ct
 
 
-def _write_jsonl(path: Path, rows: Iterable[dict]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        for r in rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+def _fetch_one(
+    session: requests.Session,
+    *,
+    url: str,
+    doc_id: str,
+    html_path: Path,
+    pdf_path: Path,
+    timeout: int,
+    run_id: str,
+    prev: FetchRecord | None = None,
+) -> tuple[Literal["saved", "not_modified", "failed"], dict | None]:
+    """Fetch one URL and save it as HTML or PDF.
+
+    `prev` is the last manifest record for a file that is still on disk; its validators
+    are sent as a conditional GET, and on 304 the saved file is kept as-is.
+    Returns the status and the manifest row (None on failure).
+    """
+    conditional: dict[str, str] = {}
+    if prev is not None:
+        if prev.etag:
+            conditional["If-None-Match"] = prev.etag
+        if prev.last_modified:
+            conditional["If-Modified-Since"] = prev.last_modified
+
+    try:
+        logger.info(f"run_id={run_id} fetching url={url}")
+        with session.get(url, timeout=timeout, stream=True, headers=conditional or None) as resp:
+            if resp.status_code == 304 and prev is not None:
+                logger.info(f"run_id={run_id} not_modified url={url} doc_id={doc_id}")
+                row = prev.model_dump(mode="json")
+                row["run_id"] = run_id
+                return "not_modified", row
 
+            resp.raise_for_status()
 
-def _read_jsonl(path: Path) -> list[dict]:
-    rows: list[dict] = []
-    if not path.exists():
-        return rows
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rows.append(json.loads(line))
-    return rows
+            content_type = resp.headers.get("Content-Type", "")
+            fetched_at = _utc_iso()
+            validators = {
+                "etag": resp.headers.get("ETag", ""),
+                "last_modified": resp.headers.get("Last-Modified", ""),
+            }
+
+            if _is_pdf(url, content_type):
+                # Stream the body to disk instead of holding the whole PDF in memory. Write to a
+                # side file first so an interrupted download is never mistaken for a saved one.
+                part_path = pdf_path.with_name(pdf_path.name + ".part")
+                size = 0
+                with part_path.open("wb") as f:
+                    for block in resp.iter_content(chunk_size=_STREAM_CHUNK_BYTES):
+                        f.write(block)
+                        size += len(block)
+                part_path.replace(pdf_path)
+                logger.info(f"run_id={run_id} saved kind=pdf path={pdf_path} bytes={size}")
+                return "saved", _manifest_row(
+                    run_id=run_id,
+                    doc_id=doc_id,
+                    url=url,
+                    kind="pdf",
+                    content_type=content_type,
+                    size=size,
+                    saved_path=pdf_path,
+                    fetched_at=fetched_at,
+                    **validators,
+                )
+
+            body = resp.content
+
+        html_path.write_text(resp.text, encoding="utf-8", errors="ignore")
+        logger.info(f"run_id={run_id} saved kind=html path={html_path} bytes={len(body)}")
+        return "saved", _manifest_row(
+            run_id=run_id,
+            doc_id=doc_id,
+            url=url,
+            kind="html",
+            content_type=content_type,
+            size=len(body),
+            saved_path=html_path,
+            fetched_at=fetched_at,
+            **validators,
+        )
+
+    except requests.HTTPError as e:
+        status = getattr(e.response, "status_code", None)
+        logger.exception(f"run_id={run_id} failed url={url} status={status} error={e}")
+    except requests.RequestException as e:
+        logger.exception(f"run_id={run_id} failed url={url} error={e}")
+    except Exception as e:
+        logger.exception(f"run_id={run_id} failed url={url} error={e}")
+    return "failed", None
 
 
 def fetch_seed_urls(cfg: AppConfig, out_raw_dir="data/raw", *, overwrite=False, run_id: str | None = None):
@@ -74,11 +195,10 @@ def fetch_seed_urls(cfg: AppConfig, out_raw_dir="data/raw", *, overwrite=False,
     ok = 0
     skipped = 0
     failed = 0
-    manifest_rows: list[dict] = []
     manifest_path = out_raw_dir / "fetch_manifest.jsonl"
 
     existing_manifest: dict[str, FetchRecord] = {}
-    for row in _read_jsonl(manifest_path):
+    for row in iter_jsonl(manifest_path, missing_ok=True):
         try:
             rec = FetchRecord.model_validate(row)
             existing_manifest[rec.doc_id] = rec
@@ -90,7 +210,11 @@ def fetch_seed_urls(cfg: AppConfig, out_raw_dir="data/raw", *, overwrite=False,
         f"run_id={run_id} stage=fetch_start seed_urls={len(seed_urls)} out_dir={out_raw_dir} overwrite={overwrite}"
     )
 
-    for url in seed_urls:
+    # Manifest rows are kept in seed order regardless of which fetch finishes first.
+    slots: list[dict | None] = [None] * len(seed_urls)
+    pending: list[tuple[int, str, str, Path, Path, FetchRecord | None]] = []
+
+    for i, url in enumerate(seed_urls):
         doc_id = _stable_id(url)
         html_path = out_raw_dir / f"{doc_id}.html"
         pdf_path = out_pdf_dir / f"{doc_id}.pdf"
@@ -106,72 +230,65 @@ def fetch_seed_urls(cfg: AppConfig, out_raw_dir="data/raw", *, overwrite=False,
                 saved_path = html_path
 
             prev = existing_manifest.get(doc_id)
-            rec = FetchRecord(
+            slots[i] = _manifest_row(
                 run_id=run_id,
                 doc_id=doc_id,
                 url=url,
                 kind=kind,
                 content_type=prev.content_type if prev else "",
-                bytes=saved_path.stat().st_size if saved_path.exists() else 0,
-                saved_path=str(saved_path),
+                size=saved_path.stat().st_size if saved_path.exists() else 0,
+                saved_path=saved_path,
                 fetched_at=prev.fetched_at if prev else _utc_iso(),
+                etag=prev.etag if prev else "",
+                last_modified=prev.last_modified if prev else "",
             )
-            manifest_rows.append(rec.model_dump(mode="json"))
             logger.info(f"run_id={run_id} skip_exists url={url} doc_id={doc_id}")
             continue
 
-        try:
-            logger.info(f"run_id={run_id} fetching url={url}")
-            resp = requests.get(url, headers=headers, timeout=timeout)
-            resp.raise_for_status()
-
-            content_type = resp.headers.get("Content-Type", "")
-            fetched_at = _utc_iso()
-
-            if _is_pdf(url, content_type):
-                pdf_path.write_bytes(resp.content)
-                rec = FetchRecord(
-                    run_id=run_id,
-                    doc_id=doc_id,
-                    url=url,
-                    kind="pdf",
-                    content_type=content_type,
-                    bytes=len(resp.content),
-                    saved_path=str(pdf_path),
-                    fetched_at=fetched_at,
-                )
-                manifest_rows.append(rec.model_dump())
-                ok += 1
-                logger.info(f"run_id={run_id} saved kind=pdf path={pdf_path} bytes={len(resp.content)}")
-                continue
-
-            html_path.write_text(resp.text, encoding="utf-8", errors="ignore")
-            rec = FetchRecord(
-                run_id=run_id,
-                doc_id=doc_id,
-                url=url,
-                kind="html",
-                content_type=content_type,
-                bytes=len(resp.content),
-                saved_path=str(html_path),
-                fetched_at=fetched_at,
-            )
-            manifest_rows.append(rec.model_dump())
-            ok += 1
-            logger.info(f"run_id={run_id} saved kind=html path={html_path} bytes={len(resp.content)}")
-
-        except requests.HTTPError as e:
-            failed += 1
-            status = getattr(e.response, "status_code", None)
-            logger.exception(f"run_id={run_id} failed url={url} status={status} error={e}")
-        except requests.RequestException as e:
-            failed += 1
-            logger.exception(f"run_id={run_id} failed url={url} error={e}")
-        except Exception as e:
-            failed += 1
-            logger.exception(f"run_id={run_id} failed url={url} error={e}")
-
-    _write_jsonl(manifest_path, manifest_rows)
+        # Refetch: revalidate against the previous copy when it is still on disk.
+        prev = existing_manifest.get(doc_id)
+        if prev is not None and not Path(prev.saved_path).exists():
+            prev = None
+        pending.append((i, url, doc_id, html_path, pdf_path, prev))
+
+    if pending:
+        # Fetches are network-bound: overlap them on a small thread pool that shares one
+        # keep-alive Session, so each host pays its TCP/TLS handshake once.
+        workers = min(int(cfg.ingestion.max_concurrency), len(pending))
+        with requests.Session() as session:
+            adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=_RETRY)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(headers)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(
+                        _fetch_one,
+                        session,
+                        url=url,
+                        doc_id=doc_id,
+                        html_path=html_path,
+                        pdf_path=pdf_path,
+                        timeout=timeout,
+                        run_id=run_id,
+                        prev=prev,
+                    ): i
+                    for i, url, doc_id, html_path, pdf_path, prev in pending
+                }
+                for fut in as_completed(futures):
+                    status, row = fut.result()
+                    if row is None:
+                        failed += 1
+                        continue
+                    slots[futures[fut]] = row
+                    if status == "not_modified":
+                        skipped += 1
+                    else:
+                        ok += 1
+
+    manifest_rows = [row for row in slots if row is not None]
+    write_jsonl(manifest_path, manifest_rows)
 
     logger.info(
         f"run_id={run_id} stage=fetch_done ok={ok} skipped={skipped} failed={failed} manifest={manifest_path}"
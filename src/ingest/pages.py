@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-import json
+import os
 import re
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Literal, Optional
+from typing import Dict, Iterator, List, Literal, Optional
 
 from bs4 import BeautifulSoup
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, ValidationError
 
+from src.core.jsonl import iter_jsonl, write_jsonl
 from src.core.logging import get_logger
 
 try:
@@ -21,8 +24,16 @@ try:
 except Exception:
     fitz = None
 
+try:
+    from lxml import etree
+except Exception:
+    etree = None
+
 logger = get_logger("ingest.pages")
 
+# Parsing stops scaling much beyond a handful of processes (disk + pickling overhead).
+_DEFAULT_MAX_WORKERS = 6
+
 
 # Heuristic: lines that look like handbook sections / headings
 SECTION_LINE = re.compile(
@@ -35,8 +46,19 @@ SECTION_LINE = re.compile(
     re.IGNORECASE,
 )
 
+# Every SECTION_LINE branch starts with "<letter>-" or with "part"/"section" (any case,
+# including the long s that IGNORECASE folds to "s"); most lines fail this before the regex.
+_SECTION_FIRST_CHARS = frozenset("pPsS\u017f")
+
+
+def _is_section_line(text: str) -> bool:
+    if text[1:2] != "-" and text[:1] not in _SECTION_FIRST_CHARS:
+        return False
+    return SECTION_LINE.match(text) is not None
+
+
 # Common nav/footer junk text seen on government handbook pages
-JUNK_EXACT = {
+JUNK_EXACT = frozenset({
     "search this handbook",
     "printer-friendly version",
     "twh glossary",
@@ -45,24 +67,18 @@ JUNK_EXACT = {
     "twh revisions",
     "twh policy bulletins",
     "twh contact us",
-}
+})
 
-JUNK_SUBSTRINGS = [
+JUNK_SUBSTRINGS = (
     "skip to main content",
     "menu button",
     "breadcrumb",
-]
+)
 
 
-class FetchRecord(BaseModel):
-    run_id: str
-    doc_id: str
-    url: HttpUrl
-    kind: Literal["html", "pdf"]
-    content_type: str = ""
-    bytes: int = Field(ge=0)
-    saved_path: str
-    fetched_at: str
+# Subtrees that never hold page content, and the block elements we pull text from.
+_SKIP_TAGS = frozenset({"script", "style", "noscript", "header", "footer", "nav", "aside"})
+_BLOCK_TAGS = ("h1", "h2", "h3", "h4", "p", "li")
 
 
 class OrganizedDoc(BaseModel):
@@ -79,33 +95,17 @@ def _utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _read_jsonl(path: Path) -> List[dict]:
-    rows: List[dict] = []
-    if not path.exists():
-        return rows
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rows.append(json.loads(line))
-    return rows
-
-
-def _write_jsonl(path: Path, rows: Iterable[dict]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        for r in rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
-
-
 def _is_junk_line(line: str) -> bool:
     s = line.strip().lower()
     if not s:
         return True
     if s in JUNK_EXACT:
         return True
-    return any(sub in s for sub in JUNK_SUBSTRINGS)
+    # A plain loop over a few literals beats both any(<genexpr>) and a regex alternation.
+    for sub in JUNK_SUBSTRINGS:
+        if sub in s:
+            return True
+    return False
 
 
 def _looks_like_toc(lines: list[str]) -> bool:
@@ -122,7 +122,7 @@ def _looks_like_toc(lines: list[str]) -> bool:
             continue
         if len(t) >= 140:
             long_para += 1
-        if len(t) <= 90 and SECTION_LINE.match(t):
+        if len(t) <= 90 and _is_section_line(t):
             short_sectionish += 1
 
     # Lots of section-looking lines, few long paragraphs => likely TOC
@@ -133,7 +133,7 @@ def _extract_main_root(html: str) -> BeautifulSoup:
     """Remove obvious non-content elements and choose a best-effort main content root."""
     soup = BeautifulSoup(html, "html.parser")
 
-    for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "aside"]):
+    for tag in soup(list(_SKIP_TAGS)):
         tag.decompose()
 
     main = (
@@ -146,23 +146,92 @@ def _extract_main_root(html: str) -> BeautifulSoup:
     return main if main is not None else soup
 
 
+def _iter_blocks_bs4(html: str) -> Iterator[tuple[str, str, bool]]:
+    root = _extract_main_root(html)
+    for el in root.find_all(list(_BLOCK_TAGS), recursive=True):
+        text = el.get_text(" ", strip=True)
+        if text:
+            yield el.name, text, el.name == "li" and el.find("a") is not None
+
+
+def _content_elements(el) -> Iterator:
+    """Descendant elements in document order, pruning _SKIP_TAGS subtrees and comments."""
+    stack = [iter(el)]
+    while stack:
+        for child in stack[-1]:
+            tag = child.tag
+            if isinstance(tag, str) and tag not in _SKIP_TAGS:
+                yield child
+                stack.append(iter(child))
+                break
+        else:
+            stack.pop()
+
+
+def _element_text(el) -> str:
+    """Same text as BeautifulSoup's get_text(" ", strip=True), skipping _SKIP_TAGS subtrees."""
+    parts: list[str] = []
+
+    def walk(e) -> None:
+        if e.text:
+            t = e.text.strip()
+            if t:
+                parts.append(t)
+        for child in e:
+            tag = child.tag
+            if isinstance(tag, str) and tag not in _SKIP_TAGS:
+                walk(child)
+            if child.tail:
+                t = child.tail.strip()
+                if t:
+                    parts.append(t)
+
+    walk(el)
+    return " ".join(parts)
+
+
+# Main-content roots in order of preference (same as _extract_main_root).
+_ROOT_CANDIDATES = (
+    lambda e: e.tag == "main",
+    lambda e: e.tag == "article",
+    lambda e: e.get("id") == "main-content",
+    lambda e: "region-content" in (e.get("class") or "").split(),
+)
+
+
+def _iter_blocks_lxml(html: str) -> Iterator[tuple[str, str, bool]]:
+    """One walk over the lxml tree; mirrors _extract_main_root + find_all without building a soup."""
+    doc = etree.fromstring(html.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+    if doc is None:
+        return
+
+    elements = list(_content_elements(doc))
+    root = None
+    for is_root in _ROOT_CANDIDATES:
+        root = next((e for e in elements if is_root(e)), None)
+        if root is not None:
+            break
+    for el in elements if root is None else _content_elements(root):
+        if el.tag not in _BLOCK_TAGS:
+            continue
+        text = _element_text(el)
+        if text:
+            has_link = el.tag == "li" and any(d.tag == "a" for d in _content_elements(el))
+            yield el.tag, text, has_link
+
+
 def parse_html_to_text(html_path: str | Path) -> str:
     """Convert a raw HTML file into cleaned plain text suitable for chunking."""
     html_path = Path(html_path)
     html = html_path.read_text(encoding="utf-8", errors="ignore")
 
-    root = _extract_main_root(html)
+    blocks = _iter_blocks_lxml(html) if etree is not None else _iter_blocks_bs4(html)
 
     raw_lines: list[str] = []
-    for el in root.find_all(["h1", "h2", "h3", "h4", "p", "li"], recursive=True):
-        text = el.get_text(" ", strip=True)
-        if not text:
-            continue
-
+    for tag, text, has_link in blocks:
         # Drop TOC-style list items: short, section-like, link-heavy
-        if el.name == "li":
-            has_link = el.find("a") is not None
-            starts_like_section = bool(SECTION_LINE.match(text))
+        if tag == "li":
+            starts_like_section = _is_section_line(text)
             if has_link and starts_like_section and len(text) <= 90:
                 continue
 
@@ -171,8 +240,7 @@ def parse_html_to_text(html_path: str | Path) -> str:
     # De-dupe and remove junk
     cleaned: list[str] = []
     prev: Optional[str] = None
-    for ln in raw_lines:
-        ln = ln.strip()
+    for ln in map(str.strip, raw_lines):
         if _is_junk_line(ln):
             continue
         if prev and ln == prev:
@@ -184,82 +252,80 @@ def parse_html_to_text(html_path: str | Path) -> str:
     if _looks_like_toc(cleaned):
         return ""
 
-    # Improve readability: add blank lines around headings
-    out_lines: list[str] = []
+    # Improve readability: blank lines around headings. One pass also rstrips, collapses
+    # blank runs to a single blank line and trims leading/trailing blanks.
+    out: list[str] = []
+    blank_pending = False
     for ln in cleaned:
-        if SECTION_LINE.match(ln) or ln.isupper():
-            out_lines.extend(["", ln, ""])  # spacing around headers
-        else:
-            out_lines.append(ln)
-
-    # Normalize whitespace
-    out = "\n".join(out_lines)
-    out = "\n".join([l.rstrip() for l in out.splitlines()])
-
-    # Collapse multiple blank lines
-    collapsed: list[str] = []
-    blank_run = 0
-    for line in out.splitlines():
-        if not line.strip():
-            blank_run += 1
-            if blank_run <= 1:
-                collapsed.append("")
-            continue
-        blank_run = 0
-        collapsed.append(line)
-
-    # Trim leading/trailing blanks
-    while collapsed and collapsed[0] == "":
-        collapsed.pop(0)
-    while collapsed and collapsed[-1] == "":
-        collapsed.pop()
+        is_header = _is_section_line(ln) or ln.isupper()
+        if is_header:
+            blank_pending = True
+        for line in ln.splitlines():
+            line = line.rstrip()
+            if not line:
+                blank_pending = True
+                continue
+            if blank_pending and out:
+                out.append("")
+            blank_pending = False
+            out.append(line)
+        if is_header:
+            blank_pending = True
 
-    return "\n".join(collapsed)
+    return "\n".join(out)
 
 
 def parse_pdf_to_text(pdf_path: str | Path) -> str:
-    """Extract text from PDF using pypdf first, then pymupdf fallback."""
+    """Extract text from PDF using pymupdf first, then pypdf fallback."""
     pdf_path = Path(pdf_path)
 
-    if PdfReader is not None:
+    if fitz is not None:
         try:
-            reader = PdfReader(str(pdf_path))
-            parts: list[str] = []
-            for page in reader.pages:
-                txt = (page.extract_text() or "").strip()
-                if txt:
-                    parts.append(txt)
+            with fitz.open(str(pdf_path)) as doc:
+                parts: list[str] = []
+                for page in doc:
+                    txt = (page.get_text("text") or "").strip()
+                    if txt:
+                        parts.append(txt)
             joined = "\n\n".join(parts).strip()
             if joined:
                 return joined
         except Exception:
             pass
 
-    if fitz is None:
-        raise RuntimeError("No PDF extractor available. Install 'pypdf' or 'pymupdf'.")
+    if PdfReader is None:
+        raise RuntimeError("No PDF extractor available. Install 'pymupdf' or 'pypdf'.")
 
-    doc = fitz.open(str(pdf_path))
-    parts: list[str] = []
-    for page in doc:
-        txt = (page.get_text("text") or "").strip()
+    reader = PdfReader(str(pdf_path), strict=False)
+    parts = []
+    for page_no, page in enumerate(reader.pages, start=1):
+        # One undecodable page should not throw away the text of the rest of the document.
+        try:
+            txt = (page.extract_text() or "").strip()
+        except Exception as e:
+            logger.warning("pdf_page_unreadable path=%s page=%d error=%r", pdf_path.name, page_no, e)
+            continue
         if txt:
             parts.append(txt)
-    doc.close()
     return "\n\n".join(parts).strip()
 
 
-def _load_manifest_map(raw_dir: Path) -> Dict[str, FetchRecord]:
-    """Map doc_id -> FetchRecord from data/raw/fetch_manifest.jsonl."""
+def _load_manifest_urls(raw_dir: Path) -> Dict[str, str]:
+    """Map doc_id -> url from data/raw/fetch_manifest.jsonl.
+
+    Only the URL is used downstream, and OrganizedDoc validates it, so rows are read as
+    plain dicts instead of being validated field by field.
+    """
     manifest_path = raw_dir / "fetch_manifest.jsonl"
-    rows = _read_jsonl(manifest_path)
 
-    out: Dict[str, FetchRecord] = {}
-    for r in rows:
-        try:
-            rec = FetchRecord.model_validate(r)
-            out[rec.doc_id] = rec
-        except Exception as e:
-            logger.warning(f"manifest_row_invalid error={e} row_keys={list(r.keys())}")
+    out: Dict[str, str] = {}
+    for r in iter_jsonl(manifest_path, missing_ok=True):
+        doc_id = r.get("doc_id")
+        url = r.get("url")
+        if isinstance(doc_id, str) and doc_id and isinstance(url, str) and url:
+            out[doc_id] = url
+        else:
+            logger.warning("manifest_row_invalid row_keys=%s", list(r.keys()))
 
     return out
 
@@ -303,26 +369,73 @@ def _make_organized_doc(
     processed_path: Path,
     text_chars: int,
     created_at: str,
-    rec: FetchRecord | None,
+    url: str | None,
 ) -> OrganizedDoc:
-    return OrganizedDoc(
+    fields = dict(
         doc_id=doc_id,
-        url=rec.url if rec is not None else _fallback_url(doc_id),
         kind=kind,
         source_path=str(source_path),
         processed_path=str(processed_path),
         text_chars=text_chars,
         created_at=created_at,
     )
+    if url is not None:
+        try:
+            return OrganizedDoc(url=url, **fields)
+        except ValidationError as e:
+            logger.warning("manifest_url_invalid doc_id=%s url=%s error=%s", doc_id, url, e)
+    return OrganizedDoc(url=_fallback_url(doc_id), **fields)
+
+
+def _organize_one(task: tuple[str, str, str, str]) -> dict:
+    """Parse one raw file and write its processed text. Runs in a worker process.
+
+    Returns a small picklable result; logging and index rows are handled by the parent.
+    """
+    kind, doc_id, source_path, out_path = task
+
+    # Any failure (parse or write) is reported back instead of raised, so one bad file
+    # doesn't abort the pool; the traceback travels with it for the parent's log.
+    try:
+        text = parse_html_to_text(source_path) if kind == "html" else parse_pdf_to_text(source_path)
+        if not text.strip():
+            return {"kind": kind, "doc_id": doc_id, "status": "skipped", "text_chars": 0, "error": ""}
+
+        Path(out_path).write_text(text, encoding="utf-8")
+    except Exception as e:
+        return {
+            "kind": kind,
+            "doc_id": doc_id,
+            "status": "failed",
+            "text_chars": 0,
+            "error": repr(e),
+            "traceback": traceback.format_exc(),
+        }
+    return {"kind": kind, "doc_id": doc_id, "status": "saved", "text_chars": len(text), "error": ""}
+
+
+def _raw_html_paths(raw_dir: Path) -> list[Path]:
+    """Sorted *.html files under raw_dir, never descending into pdfs/ directories."""
+    paths: list[Path] = []
+    for root, dirs, files in os.walk(raw_dir):
+        dirs[:] = [d for d in dirs if d != "pdfs"]
+        paths.extend(Path(root, name) for name in files if name.endswith(".html"))
+    paths.sort()
+    return paths
 
 
 def organize_all(
     raw_dir: str | Path = "data/raw",
     processed_dir: str | Path = "data/processed",
     organized_dir: str | Path = "data/organized",
+    *,
+    max_workers: int | None = None,
 ) -> dict[str, int]:
     """Convert raw HTML/PDF into cleaned .txt files + write docs index.
 
+    Files are parsed in a process pool (`max_workers` defaults to min(CPU count, 6));
+    the index keeps the same sorted HTML-then-PDF order as a serial run.
+
     Outputs:
       - data/processed/<doc_id>.txt
       - data/organized/docs.jsonl
@@ -336,10 +449,11 @@ def organize_all(
     processed_dir.mkdir(parents=True, exist_ok=True)
     organized_dir.mkdir(parents=True, exist_ok=True)
 
-    manifest_map = _load_manifest_map(raw_dir)
+    manifest_urls = _load_manifest_urls(raw_dir)
 
     html_saved = 0
     html_skipped = 0
+    html_failed = 0
     pdf_saved = 0
     pdf_skipped = 0
     pdf_failed = 0
@@ -347,87 +461,91 @@ def organize_all(
     organized_rows: list[dict] = []
     created_at = _utc_iso()
 
-    # HTML
-    for hp in sorted(raw_dir.rglob("*.html")):
-        if "pdfs" in hp.parts:
-            continue
+    tasks: list[tuple[str, str, str, str]] = []
+    for hp in _raw_html_paths(raw_dir):
+        stem = hp.stem
+        tasks.append(("html", stem, str(hp), str(processed_dir / f"{stem}.txt")))
 
-        doc_id = hp.stem
-        rec = manifest_map.get(doc_id)
-        if rec is None:
-            logger.warning(f"missing_manifest_for_html doc_id={doc_id} path={hp}")
+    pdf_dir = raw_dir / "pdfs"
+    if pdf_dir.exists():
+        for pp in sorted(pdf_dir.glob("*.pdf")):
+            stem = pp.stem
+            tasks.append(("pdf", stem, str(pp), str(processed_dir / f"{stem}.txt")))
+
+    for kind, doc_id, source_path, _ in tasks:
+        if doc_id not in manifest_urls:
+            logger.warning("missing_manifest_for_%s doc_id=%s path=%s", kind, doc_id, source_path)
+
+    workers = min(max_workers or min(os.cpu_count() or 1, _DEFAULT_MAX_WORKERS), len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_organize_one, tasks, chunksize=max(len(tasks) // (workers * 4), 1)))
+    else:
+        results = [_organize_one(t) for t in tasks]
+
+    for (kind, doc_id, source_path, out_path), res in zip(tasks, results):
+        status = res["status"]
+
+        if status == "failed":
+            if kind == "html":
+                html_failed += 1
+            else:
+                pdf_failed += 1
+            logger.error(
+                "failed_%s doc_id=%s path=%s error=%s\n%s",
+                kind,
+                doc_id,
+                Path(source_path).name,
+                res["error"],
+                res["traceback"].rstrip(),
+            )
+            continue
 
-        text = parse_html_to_text(hp)
-        if not text:
-            html_skipped += 1
-            logger.info(f"skip_html_empty doc_id={doc_id} path={hp.name}")
+        if status == "skipped":
+            if kind == "html":
+                html_skipped += 1
+            else:
+                pdf_skipped += 1
+            logger.info("skip_%s_empty doc_id=%s path=%s", kind, doc_id, Path(source_path).name)
             continue
 
-        out_path = processed_dir / f"{doc_id}.txt"
-        out_path.write_text(text, encoding="utf-8")
-        html_saved += 1
+        if kind == "html":
+            html_saved += 1
+        else:
+            pdf_saved += 1
 
         meta = _make_organized_doc(
             doc_id=doc_id,
-            kind="html",
-            source_path=hp,
-            processed_path=out_path,
-            text_chars=len(text),
+            kind=kind,  # type: ignore[arg-type]
+            source_path=Path(source_path),
+            processed_path=Path(out_path),
+            text_chars=res["text_chars"],
             created_at=created_at,
-            rec=rec,
+            url=manifest_urls.get(doc_id),
         )
         organized_rows.append(meta.model_dump(mode="json"))
 
-        logger.info(f"saved_html doc_id={doc_id} chars={len(text)} out={out_path}")
-
-    # PDFs
-    pdf_dir = raw_dir / "pdfs"
-    if pdf_dir.exists():
-        for pp in sorted(pdf_dir.glob("*.pdf")):
-            doc_id = pp.stem
-            rec = manifest_map.get(doc_id)
-            if rec is None:
-                logger.warning(f"missing_manifest_for_pdf doc_id={doc_id} path={pp}")
-
-            try:
-                pdf_text = parse_pdf_to_text(pp)
-                if not pdf_text.strip():
-                    pdf_skipped += 1
-                    logger.info(f"skip_pdf_empty doc_id={doc_id} path={pp.name}")
-                    continue
-
-                out_path = processed_dir / f"{doc_id}.txt"
-                out_path.write_text(pdf_text, encoding="utf-8")
-                pdf_saved += 1
-
-                meta = _make_organized_doc(
-                    doc_id=doc_id,
-                    kind="pdf",
-                    source_path=pp,
-                    processed_path=out_path,
-                    text_chars=len(pdf_text),
-                    created_at=created_at,
-                    rec=rec,
-                )
-                organized_rows.append(meta.model_dump(mode="json"))
-
-                logger.info(f"saved_pdf doc_id={doc_id} chars={len(pdf_text)} out={out_path}")
-
-            except Exception as e:
-                pdf_failed += 1
-                logger.exception(f"failed_pdf doc_id={doc_id} path={pp.name} error={e}")
+        logger.info("saved_%s doc_id=%s chars=%d out=%s", kind, doc_id, res["text_chars"], out_path)
 
     index_path = organized_dir / "docs.jsonl"
-    _write_jsonl(index_path, organized_rows)
+    write_jsonl(index_path, organized_rows)
 
     logger.info(
-        f"stage=organize_summary html_saved={html_saved} html_skipped={html_skipped} "
-        f"pdf_saved={pdf_saved} pdf_skipped={pdf_skipped} pdf_failed={pdf_failed} index={index_path}"
+        "stage=organize_summary html_saved=%d html_skipped=%d html_failed=%d "
+        "pdf_saved=%d pdf_skipped=%d pdf_failed=%d index=%s",
+        html_saved,
+        html_skipped,
+        html_failed,
+        pdf_saved,
+        pdf_skipped,
+        pdf_failed,
+        index_path,
     )
 
     return {
         "html_saved": html_saved,
         "html_skipped": html_skipped,
+        "html_failed": html_failed,
         "pdf_saved": pdf_saved,
         "pdf_skipped": pdf_skipped,
         "pdf_failed": pdf_failed,
@@ -442,4 +560,4 @@ __all__ = ["organize_all", "clean_all", "parse_html_to_text", "parse_pdf_to_text
 
 if __name__ == "__main__":
     summary = organize_all()
-    logger.info(f"summary={summary}")
+    logger.info("summary=%s", summary)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+class BM25Index:
+    """Okapi BM25 over a term -> postings (CSR) layout.
+
+    Scores match `rank_bm25.BM25Okapi` (same idf floor and term weights), but a query
+    only touches the postings of its own terms instead of scanning every document per
+    query token in Python.
+    """
+
+    def __init__(
+        self,
+        corpus: Iterable[Sequence[str]],
+        *,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        vocab: Dict[str, int] = {}
+        df: List[int] = []
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        tfs: List[int] = []
+        doc_len: List[int] = []
+
+        for doc_id, tokens in enumerate(corpus):
+            doc_len.append(len(tokens))
+            for word, tf in Counter(tokens).items():
+                tid = vocab.get(word)
+                if tid is None:
+                    tid = vocab[word] = len(df)
+                    df.append(0)
+                df[tid] += 1
+                term_ids.append(tid)
+                doc_ids.append(doc_id)
+                tfs.append(tf)
+
+        self.corpus_size = len(doc_len)
+        if self.corpus_size == 0:
+            raise ValueError("BM25Index needs at least one document")
+        self.avgdl = sum(doc_len) / self.corpus_size
+        self.vocab = vocab
+
+        # Same idf (and negative-idf floor) as BM25Okapi, accumulated in first-seen order.
+        idf = [math.log(self.corpus_size - freq + 0.5) - math.log(freq + 0.5) for freq in df]
+        average_idf = sum(idf) / len(idf) if idf else 0.0
+        eps = epsilon * average_idf
+        self.idf = [v if v >= 0 else eps for v in idf]
+
+        tids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(tids, kind="stable")
+        self._indptr = np.zeros(len(df) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tids, minlength=len(df)), out=self._indptr[1:])
+        self._doc_ids = np.asarray(doc_ids, dtype=np.int64)[order]
+
+        tf = np.asarray(tfs, dtype=np.float64)[order]
+        dl = np.asarray(doc_len, dtype=np.float64)[self._doc_ids]
+        self._weights = tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / self.avgdl))
+
+    def get_scores(self, query: Sequence[str]) -> np.ndarray:
+        score = np.zeros(self.corpus_size)
+        for q in query:
+            tid = self.vocab.get(q)
+            if tid is None:
+                continue
+            start, end = self._indptr[tid], self._indptr[tid + 1]
+            score[self._doc_ids[start:end]] += self.idf[tid] * self._weights[start:end]
+        return score
+
+    def top_n(self, query: Sequence[str], n: int) -> np.ndarray:
+        """Row indices of the `n` best documents, in the same order as BM25Okapi.get_top_n."""
+        return np.argsort(self.get_scores(query))[::-1][:n]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` highest scores, descending, ties in index order.
+
+    Same result as a stable descending argsort truncated to `k`, but selects with
+    a linear-time partition and only sorts the `k` survivors.
+    """
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[: k - len(above)]
+    rows = np.concatenate([above, ties])
+    rows.sort()
+    return rows[np.argsort(-scores[rows], kind="stable")]
+
+
+__all__ = ["BM25Index", "top_k_indices"]
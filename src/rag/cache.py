@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, List, TypeVar
+
+import numpy as np
+
+V = TypeVar("V")
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    q = np.asarray(vector, dtype=np.float32).reshape(-1)
+    return q / (np.linalg.norm(q) + 1e-12)
+
+
+class LRUCache(Generic[V]):
+    """Thread-safe LRU map with an optional per-entry TTL."""
+
+    def __init__(self, *, maxsize: int = 1024, ttl_seconds: float | None = None) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be > 0")
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SemanticCache(Generic[V]):
+    """Nearest-neighbour cache over query embeddings (normalized on the way in).
+
+    `get` returns the value stored for the most similar previous query when its cosine
+    similarity is at least `threshold` and it was stored under the same `tag` (e.g. the
+    request's top_k). Entries expire after `ttl_seconds`; when full, the least recently
+    used entry is replaced.
+    """
+
+    def __init__(
+        self,
+        *,
+        dim: int,
+        threshold: float = 0.95,
+        max_entries: int = 1024,
+        ttl_seconds: float = 600.0,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._stored_at = np.zeros(max_entries, dtype=np.float64)
+        self._used_at = np.zeros(max_entries, dtype=np.float64)
+        self._tags: List[Any] = [None] * max_entries
+        self._values: List[V | None] = [None] * max_entries
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, vector: np.ndarray, *, tag: Any = None) -> V | None:
+        q = _unit(vector)
+        with self._lock:
+            n = self._size
+            if n == 0:
+                return None
+            now = time.monotonic()
+            sims = self._vectors[:n] @ q
+            sims[now - self._stored_at[:n] > self.ttl_seconds] = -np.inf
+            for i in np.flatnonzero(sims >= self.threshold):
+                if self._tags[i] != tag:
+                    sims[i] = -np.inf
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            self._used_at[best] = now
+            return self._values[best]
+
+    def put(self, vector: np.ndarray, value: V, *, tag: Any = None) -> None:
+        q = _unit(vector)
+        with self._lock:
+            now = time.monotonic()
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                expired = np.flatnonzero(now - self._stored_at > self.ttl_seconds)
+                slot = int(expired[0]) if expired.size else int(np.argmin(self._used_at))
+            self._vectors[slot] = q
+            self._stored_at[slot] = now
+            self._used_at[slot] = now
+            self._tags[slot] = tag
+            self._values[slot] = value
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def numeric_signature(text: str) -> tuple[str, ...]:
+    """Digits in `text`, in order.
+
+    Meant to be part of a SemanticCache tag: questions that differ only in an amount
+    ("income limit for 2 people" vs "for 3 people") embed almost identically.
+    """
+    return tuple(_NUMBER_RE.findall(text))
+
+
+__all__ = ["LRUCache", "SemanticCache", "numeric_signature"]
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
+import tempfile
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
@@ -8,13 +11,16 @@ from typing import Any, Dict, Iterable, List
 
 import faiss
 import numpy as np
-from openai import OpenAI
+from openai import AsyncOpenAI
 from tqdm import tqdm
 
+from src.core.jsonl import iter_jsonl, write_jsonl
 from src.core.settings import AppConfig
+from src.rag.embed_store import EmbeddingStore, embedding_key
+from src.rag.faiss_index import build_index
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Chunk:
     chunk_id: str
     text: str
@@ -25,25 +31,6 @@ def _utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _read_jsonl(path: Path) -> Iterable[Dict[str, Any]]:
-    with path.open("r", encoding="utf-8") as f:
-        for line_no, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON on line {line_no} in {path}: {e}") from e
-
-
-def _write_jsonl(path: Path, rows: Iterable[Dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
-
-
 def _to_int(value: Any, default: int = 0) -> int:
     try:
         return int(value)
@@ -51,11 +38,6 @@ def _to_int(value: Any, default: int = 0) -> int:
         return default
 
 
-def _l2_normalize(x: np.ndarray) -> np.ndarray:
-    norms = np.linalg.norm(x, axis=1, keepdims=True) + 1e-12
-    return x / norms
-
-
 def _batched(items: List[str], batch_size: int) -> Iterable[List[str]]:
     for i in range(0, len(items), batch_size):
         yield items[i : i + batch_size]
@@ -66,7 +48,7 @@ def load_chunks(chunks_path: Path, *, min_text_chars: int = 20) -> List[Chunk]:
         raise FileNotFoundError(f"Chunks file not found: {chunks_path}")
 
     out: List[Chunk] = []
-    for row in _read_jsonl(chunks_path):
+    for row in iter_jsonl(chunks_path):
         text = str(row.get("text", "")).strip()
         if len(text) < min_text_chars:
             continue
@@ -99,26 +81,105 @@ def load_chunks(chunks_path: Path, *, min_text_chars: int = 20) -> List[Chunk]:
     return out
 
 
-def embed_openai(
+async def embed_openai(
     *,
-    client: OpenAI,
+    client: AsyncOpenAI,
     texts: List[str],
     model: str,
     batch_size: int,
+    max_concurrency: int = 4,
 ) -> np.ndarray:
-    vectors: List[List[float]] = []
-    total_batches = (len(texts) + batch_size - 1) // batch_size
+    """Embed `texts` with up to `max_concurrency` batch requests in flight.
 
-    for batch in tqdm(_batched(texts, batch_size), total=total_batches, desc="Embedding"):
-        response = client.embeddings.create(model=model, input=batch)
-        batch_vectors = [item.embedding for item in response.data]
-        if len(batch_vectors) != len(batch):
+    Each batch is decoded straight into a preallocated float32 matrix, so rows keep the
+    input order regardless of which request finishes first.
+    """
+    total_batches = (len(texts) + batch_size - 1) // batch_size
+    semaphore = asyncio.Semaphore(max_concurrency)
+    vectors: np.ndarray | None = None
+
+    async def embed_batch(start: int, batch: List[str], progress: tqdm) -> None:
+        nonlocal vectors
+        async with semaphore:
+            # base64 is the raw little-endian float32 buffer; decoding it ourselves skips the
+            # SDK's list-of-Python-floats step.
+            response = await client.embeddings.create(model=model, input=batch, encoding_format="base64")
+        if len(response.data) != len(batch):
             raise RuntimeError(
-                f"Embedding count mismatch: got {len(batch_vectors)} vectors for {len(batch)} texts."
+                f"Embedding count mismatch: got {len(response.data)} vectors for {len(batch)} texts."
+            )
+        for offset, item in enumerate(response.data):
+            row = np.frombuffer(base64.b64decode(item.embedding), dtype="<f4")
+            if vectors is None:
+                vectors = np.empty((len(texts), row.size), dtype=np.float32)
+            vectors[start + offset] = row
+        progress.update(1)
+
+    with tqdm(total=total_batches, desc="Embedding") as progress:
+        await asyncio.gather(
+            *(
+                embed_batch(i * batch_size, batch, progress)
+                for i, batch in enumerate(_batched(texts, batch_size))
             )
-        vectors.extend(batch_vectors)
+        )
 
-    return np.asarray(vectors, dtype=np.float32)
+    if vectors is None:
+        return np.empty((0, 0), dtype=np.float32)
+    return vectors
+
+
+async def _embed_with_client(texts: List[str], cfg: AppConfig) -> np.ndarray:
+    # Close the client's connection pool inside the event loop that opened it.
+    async with AsyncOpenAI(max_retries=cfg.embedding.max_retries) as client:
+        return await embed_openai(
+            client=client,
+            texts=texts,
+            model=cfg.embedding.model,
+            batch_size=cfg.embedding.batch_size,
+            max_concurrency=cfg.embedding.max_concurrency,
+        )
+
+
+def _embed_cached(
+    texts: List[str],
+    cfg: AppConfig,
+    store: EmbeddingStore,
+    *,
+    scratch_dir: Path | None = None,
+) -> np.ndarray:
+    """Embed `texts`, reusing stored vectors and sending each distinct missing text once.
+
+    With `scratch_dir`, the result is a memory map over an anonymous temp file there, so
+    the N x D matrix is backed by disk rather than held in RAM next to the index.
+    """
+    keys = [embedding_key(cfg.embedding.model, t) for t in texts]
+    vectors_by_key = store.get_many(keys)
+
+    # Boilerplate paragraphs repeat across pages; identical texts share one key and one request.
+    to_embed: Dict[bytes, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors_by_key and key not in to_embed:
+            to_embed[key] = text
+    hits = sum(key in vectors_by_key for key in keys)
+    print(
+        f"[embed] cache hits={hits} misses={len(texts) - hits} unique_misses={len(to_embed)} "
+        f"store={store.path}"
+    )
+
+    if to_embed:
+        fresh = asyncio.run(_embed_with_client(list(to_embed.values()), cfg))
+        store.put_many(to_embed.keys(), fresh)
+        vectors_by_key.update(zip(to_embed.keys(), fresh))
+
+    dim = next(iter(vectors_by_key.values())).size
+    if scratch_dir is not None:
+        scratch = tempfile.TemporaryFile(dir=scratch_dir)  # unlinked; removed once unmapped
+        vectors = np.memmap(scratch, dtype=np.float32, mode="w+", shape=(len(texts), dim))
+    else:
+        vectors = np.empty((len(texts), dim), dtype=np.float32)
+    for i, key in enumerate(keys):
+        vectors[i] = vectors_by_key[key]
+    return vectors
 
 
 def main() -> None:
@@ -133,6 +194,7 @@ def main() -> None:
     index_path = out_dir / "index.faiss"
     meta_path = out_dir / "meta.jsonl"
     run_meta_path = out_dir / "index_meta.json"
+    cache_path = Path("artifacts/embed_cache/embeddings.sqlite3")
 
     print(f"[load] chunks from: {chunks_path}")
     chunks = load_chunks(chunks_path)
@@ -140,32 +202,31 @@ def main() -> None:
 
     texts = [c.text for c in chunks]
 
-    print(f"[embed] provider=openai model={cfg.embedding.model} batch_size={cfg.embedding.batch_size}")
-    client = OpenAI()
-    vectors = embed_openai(
-        client=client,
-        texts=texts,
-        model=cfg.embedding.model,
-        batch_size=cfg.embedding.batch_size,
+    print(
+        f"[embed] provider=openai model={cfg.embedding.model} batch_size={cfg.embedding.batch_size} "
+        f"max_concurrency={cfg.embedding.max_concurrency}"
     )
-    vectors = _l2_normalize(vectors)
+    with EmbeddingStore(cache_path) as store:
+        vectors = _embed_cached(texts, cfg, store, scratch_dir=out_dir)
+    faiss.normalize_L2(vectors)  # in place; no (N, D) temporary
 
     dim = vectors.shape[1]
-    index = faiss.IndexFlatIP(dim)
-    index.add(vectors)
+    index, index_type = build_index(vectors, cfg.index)
+    print(f"[index] type={index_type} requested={cfg.index.type}")
     faiss.write_index(index, str(index_path))
-
-    meta_rows: List[Dict[str, Any]] = []
-    for row, chunk in enumerate(chunks):
-        meta_rows.append(
-            {
-                "row": row,
-                "id": chunk.chunk_id,
-                "metadata": chunk.metadata,
-                "text": chunk.text,
-            }
-        )
-    _write_jsonl(meta_path, meta_rows)
+    del vectors  # drop the scratch mapping before writing metadata
+
+    # Rows are serialized as they are generated; no second in-memory copy of every chunk text.
+    meta_rows = (
+        {
+            "row": row,
+            "id": chunk.chunk_id,
+            "metadata": chunk.metadata,
+            "text": chunk.text,
+        }
+        for row, chunk in enumerate(chunks)
+    )
+    write_jsonl(meta_path, meta_rows)
 
     run_meta = {
         "created_at": _utc_iso(),
@@ -173,6 +234,7 @@ def main() -> None:
         "embedding_model": cfg.embedding.model,
         "vectors": len(chunks),
         "dimension": dim,
+        "index_type": index_type,
         "chunks_path": str(chunks_path),
         "index_path": str(index_path),
         "meta_path": str(meta_path),
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+# SQLite's default limit on bound parameters per statement is 999.
+_MAX_PARAMS = 900
+
+
+def embedding_key(model: str, text: str) -> bytes:
+    """Content address of one embedding: sha256 over the model name and the exact text."""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+
+
+class EmbeddingStore:
+    """Persistent key -> float32 vector map backed by a single SQLite file.
+
+    Rebuilding the index only has to embed chunks whose text (or model) changed since
+    the last run; everything else is read back from disk.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL) WITHOUT ROWID"
+        )
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        found: Dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), _MAX_PARAMS):
+            part = unique[i : i + _MAX_PARAMS]
+            placeholders = ",".join("?" * len(part))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype="<f4")
+        return found
+
+    def put_many(self, keys: Iterable[bytes], vectors: np.ndarray) -> None:
+        rows: List[tuple[bytes, bytes]] = [
+            (key, np.ascontiguousarray(vec, dtype="<f4").tobytes()) for key, vec in zip(keys, vectors)
+        ]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "EmbeddingStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+__all__ = ["EmbeddingStore", "embedding_key"]
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import math
+import os
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from src.core.logging import get_logger
+from src.core.settings import IndexConfig
+
+logger = get_logger("rag.faiss_index")
+
+# 8-bit PQ codebooks need at least 2**8 training points per sub-quantizer.
+_PQ_MIN_TRAIN = 256
+
+# Rows handed to index.add per call, so a disk-backed matrix is read in bounded slices.
+_ADD_BATCH = 65_536
+
+
+def _nlist_for(n_vectors: int, cfg: IndexConfig) -> int:
+    if cfg.nlist:
+        return cfg.nlist
+    return max(int(4 * math.sqrt(n_vectors)), 1)
+
+
+def _add_batched(index: faiss.Index, vectors: np.ndarray) -> None:
+    for start in range(0, len(vectors), _ADD_BATCH):
+        index.add(np.ascontiguousarray(vectors[start : start + _ADD_BATCH]))
+
+
+def _apply_omp_threads(cfg: IndexConfig) -> None:
+    # Batched searches and IVF training parallelize over OpenMP; when many API workers
+    # search concurrently, fewer threads per search avoids oversubscribing the cores.
+    if cfg.omp_threads:
+        faiss.omp_set_num_threads(cfg.omp_threads)
+
+
+def _nprobe_for(nlist: int, cfg: IndexConfig) -> int:
+    if cfg.nprobe:
+        return cfg.nprobe
+    return max(2, nlist // 50)
+
+
+_GPU_RESOURCES = None
+
+
+def _gpu_resources():
+    """Shared StandardGpuResources for GPU 0, or None without faiss-gpu or a device."""
+    global _GPU_RESOURCES
+    if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+        return None
+    if _GPU_RESOURCES is None:
+        _GPU_RESOURCES = faiss.StandardGpuResources()  # one scratch pool per process
+    return _GPU_RESOURCES
+
+
+def _to_gpu(index: faiss.Index) -> faiss.Index:
+    """Copy an index to GPU 0 (faiss-gpu builds only); returns the CPU index otherwise."""
+    res = _gpu_resources()
+    if res is None:
+        logger.warning("index.gpu is set but no faiss GPU device is available; searching on CPU")
+        return index
+    try:
+        return faiss.index_cpu_to_gpu(res, 0, index)
+    except RuntimeError as e:
+        logger.warning(f"index_gpu_unsupported error={e}; searching on CPU")
+        return index
+
+
+def _train_and_add(index: faiss.Index, vectors: np.ndarray, *, gpu: bool) -> faiss.Index:
+    """Train and fill a CPU index; with `gpu`, k-means and adds run on GPU 0 and the result is copied back."""
+    res = _gpu_resources() if gpu else None
+    if res is not None:
+        try:
+            gpu_index = faiss.index_cpu_to_gpu(res, 0, index)
+            gpu_index.train(vectors)
+            _add_batched(gpu_index, vectors)
+            return faiss.index_gpu_to_cpu(gpu_index)
+        except RuntimeError as e:
+            logger.warning(f"index_gpu_build_unsupported error={e}; training on CPU")
+    elif gpu:
+        logger.warning("index.gpu is set but no faiss GPU device is available; training on CPU")
+
+    index.train(vectors)
+    _add_batched(index, vectors)
+    return index
+
+
+def build_index(vectors: np.ndarray, cfg: IndexConfig) -> tuple[faiss.Index, str]:
+    """Build an inner-product index over L2-normalized vectors.
+
+    Returns the index and the type actually built. IVF-PQ falls back to a flat index
+    when there are too few vectors to train it; `auto` only asks for IVF-PQ once the
+    corpus reaches `auto_ivfpq_min_vectors`. With `cfg.gpu`, IVF-PQ training runs on the GPU.
+    """
+    n, dim = vectors.shape
+    _apply_omp_threads(cfg)
+
+    if cfg.type == "ivfpq" or (cfg.type == "auto" and n >= cfg.auto_ivfpq_min_vectors):
+        nlist = _nlist_for(n, cfg)
+        if dim % cfg.pq_m != 0:
+            raise ValueError(f"index.pq_m={cfg.pq_m} must divide the embedding dimension {dim}")
+        if n >= max(nlist, _PQ_MIN_TRAIN):
+            index = faiss.index_factory(dim, f"IVF{nlist},PQ{cfg.pq_m}", faiss.METRIC_INNER_PRODUCT)
+            index = _train_and_add(index, vectors, gpu=cfg.gpu)
+            faiss.extract_index_ivf(index).nprobe = _nprobe_for(nlist, cfg)
+            return index, f"IVF{nlist},PQ{cfg.pq_m}"
+
+    if cfg.type == "hnsw":
+        # Graph search: sub-linear queries over exact vectors, no training pass. Not GPU-capable.
+        index = faiss.IndexHNSWFlat(dim, cfg.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = cfg.ef_construction
+        _add_batched(index, vectors)
+        index.hnsw.efSearch = cfg.ef_search
+        return index, f"HNSW{cfg.hnsw_m},Flat"
+
+    if cfg.type == "sqfp16":
+        # Half-precision codes: half the memory and scan bandwidth of Flat, exact up to fp16 rounding.
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+        _add_batched(index, vectors)  # fp16 has no trained range, so no train() pass
+        return index, "SQfp16"
+
+    if cfg.type == "sq8":
+        # 8-bit codes: a quarter of Flat's memory; train() learns each dimension's value range.
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        index = _train_and_add(index, vectors, gpu=cfg.gpu)
+        return index, "SQ8"
+
+    index = faiss.IndexFlatIP(dim)
+    _add_batched(index, vectors)
+    return index, "Flat"
+
+
+def _prefetch(path: str) -> None:
+    """Ask the kernel to start reading the file into the page cache (Linux/Unix only)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, os.fstat(fd).st_size, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_index(path: str | Path, cfg: IndexConfig | None = None) -> faiss.Index:
+    """Read an index, memory-mapped read-only when the format supports it.
+
+    With `cfg.gpu`, the loaded index is copied to the GPU for search.
+    """
+    cfg = cfg or IndexConfig()
+    path = str(path)
+    _apply_omp_threads(cfg)
+
+    index = None
+    if cfg.mmap:
+        # Pages of a mapped index fault in lazily; prefetching keeps that off the first queries.
+        _prefetch(path)
+        try:
+            index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except Exception:
+            index = None
+    if index is None:
+        index = faiss.read_index(path)
+
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        ivf = None  # not an IVF index
+    if ivf is not None:
+        ivf.nprobe = _nprobe_for(ivf.nlist, cfg)
+
+    hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = cfg.ef_search
+
+    if cfg.gpu:
+        index = _to_gpu(index)  # nprobe is carried over by the copy
+
+    return index
+
+
+__all__ = ["build_index", "read_index"]
@@ -1,22 +1,27 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import os
 import re
 import textwrap
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Sequence
 from urllib.parse import urlparse, urlunparse
 
-from langchain_community.retrievers import BM25Retriever
+import numpy as np
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 
+from src.core.jsonl import iter_jsonl
 from src.core.settings import AppConfig
+from src.rag.bm25 import BM25Index
+from src.rag.cache import LRUCache
 
 try:
     from langchain_ollama import OllamaLLM as _OllamaLLM  # type: ignore[import-not-found]
@@ -28,29 +33,21 @@ except ImportError:
     _USING_LEGACY_OLLAMA = True
 
 
-def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line_no, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON on line {line_no} in {path}: {e}") from e
-    return rows
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _token_set(text: str) -> frozenset[str]:
+    return frozenset(_TOKEN_RE.findall(text.lower()))
 
 
-def _tokenize(text: str) -> List[str]:
-    return re.findall(r"[a-z0-9]+", text.lower())
+# Repeated questions skip the regex scan; chunk-side sets are memoized per instance.
+_query_token_set = lru_cache(maxsize=4096)(_token_set)
 
 
-def _coverage(query: str, text: str) -> float:
-    query_tokens = set(_tokenize(query))
+def _coverage(query_tokens: frozenset[str], text_tokens: frozenset[str]) -> float:
+    """Fraction of distinct query tokens that also occur in the text."""
     if not query_tokens:
         return 0.0
-    text_tokens = set(_tokenize(text))
     return len(query_tokens & text_tokens) / len(query_tokens)
 
 
@@ -108,20 +105,6 @@ def _to_document_from_meta_row(row: Dict[str, Any]) -> Document | None:
     return Document(page_content=text, metadata=metadata)
 
 
-def _format_context(docs: List[Document], max_chars_per_chunk: int = 1200) -> str:
-    blocks: List[str] = []
-    for i, doc in enumerate(docs, start=1):
-        md = doc.metadata or {}
-        text = doc.page_content.strip().replace("\n", " ")
-        if len(text) > max_chars_per_chunk:
-            text = text[:max_chars_per_chunk].rstrip() + " ..."
-        blocks.append(
-            f"[{i}] doc_id={md.get('doc_id')} span={md.get('start_char')}-{md.get('end_char')} "
-            f"url={md.get('url')}\n{text}\n"
-        )
-    return "\n".join(blocks)
-
-
 @dataclass(frozen=True)
 class LangChainCitation:
     cite: str
@@ -132,6 +115,31 @@ class LangChainCitation:
     dense_score: float | None
     bm25_score: float | None
     coverage: float
+    # Pulled out of `metadata` once so prompt and response building use attribute access.
+    doc_id: str | None = None
+    url: str | None = None
+    start_char: int | None = None
+    end_char: int | None = None
+    context_text: str = ""
+
+
+_NL_TABLE = str.maketrans({"\n": " ", "\r": " "})
+_MAX_CONTEXT_CHARS_PER_CHUNK = 1200
+
+
+def _context_text(text: str, max_chars_per_chunk: int = _MAX_CONTEXT_CHARS_PER_CHUNK) -> str:
+    """Single-line, truncated chunk text as it appears in the prompt."""
+    text = text.strip()
+    # Truncate before remapping newlines so long chunks are only copied once.
+    if len(text) > max_chars_per_chunk:
+        return text[:max_chars_per_chunk].translate(_NL_TABLE).rstrip() + " ..."
+    return text.translate(_NL_TABLE)
+
+
+def _format_context(citations: List[LangChainCitation]) -> str:
+    return "\n".join(
+        [f"{c.cite} doc_id={c.doc_id} span={c.start_char}-{c.end_char} url={c.url}\n{c.context_text}\n" for c in citations]
+    )
 
 
 @dataclass(frozen=True)
@@ -146,6 +154,20 @@ class LangChainRagResult:
     total_seconds: float
 
 
+@dataclass(frozen=True)
+class _PreparedAnswer:
+    refusal: LangChainRagResult | None
+    citations: List[LangChainCitation]
+    context_block: str
+    fallback_reason: str
+    retrieval_seconds: float
+
+
+_GENERATION_UNAVAILABLE = (
+    "I found relevant context, but answer generation is temporarily unavailable. Please retry."
+)
+
+
 class LangChainRAG:
     def __init__(
         self,
@@ -157,6 +179,7 @@ class LangChainRAG:
         ollama_url: str | None = None,
         ollama_model: str | None = None,
         disable_generation: bool = False,
+        dense_workers: int = 4,
     ) -> None:
         self.cfg = AppConfig.load(config_path)
         self.min_score = float(self.cfg.retrieval.min_score)
@@ -167,15 +190,21 @@ class LangChainRAG:
         self.retrieval_mode = "langchain_bm25"
         self.hybrid_enabled = False
         self.hybrid_disabled_reason = ""
+        # Exact-text memo of query embeddings, so an answer-cache lookup and the dense
+        # search for the same question share one embeddings API call.
+        self._query_vectors: LRUCache[np.ndarray] = LRUCache(maxsize=1024)
+        # Prompt-ready text per chunk_id, built the first time a chunk is cited.
+        self._context_texts: Dict[str, str] = {}
+        # Distinct lowercase tokens per chunk_id, built the first time a chunk is ranked.
+        self._chunk_tokens: Dict[str, frozenset[str]] = {}
 
         chunk_file = Path(chunks_path)
         if not chunk_file.exists():
             raise FileNotFoundError(f"Chunks file not found: {chunk_file}")
 
-        rows = _read_jsonl(chunk_file)
         docs: List[Document] = []
         self.docs_by_chunk_id: Dict[str, Document] = {}
-        for row in rows:
+        for row in iter_jsonl(chunk_file):
             doc = _to_document(row)
             if doc is not None:
                 docs.append(doc)
@@ -184,9 +213,15 @@ class LangChainRAG:
         if not docs:
             raise RuntimeError(f"No usable chunks in {chunk_file}")
 
-        self.bm25_retriever = BM25Retriever.from_documents(docs)
-        self.bm25_retriever.k = max(self.cfg.retrieval.top_k, 1)
+        # Same whitespace tokenization and Okapi scoring as LangChain's BM25Retriever.
+        self.bm25_docs: List[Document] = docs
+        # Row-aligned with bm25_docs, so BM25 hits resolve ids by row instead of via doc.metadata.
+        self._bm25_chunk_ids: List[str] = [doc.metadata["chunk_id"] for doc in docs]
+        self.bm25 = BM25Index(doc.page_content.split() for doc in docs)
 
+        # Runs the embedding round-trip while BM25 ranks on the caller's thread; sized for
+        # the number of concurrent callers (threads are only started as needed).
+        self._dense_pool = ThreadPoolExecutor(max_workers=max(dense_workers, 1), thread_name_prefix="dense")
         self.vector_store = None
         if self.cfg.retrieval.hybrid:
             self._init_faiss_vector_retriever(index_path=index_path, meta_path=meta_path)
@@ -238,27 +273,23 @@ class LangChainRAG:
             return
 
         try:
-            import faiss  # type: ignore[import-untyped]
             from langchain_community.docstore.in_memory import InMemoryDocstore
             from langchain_community.embeddings import OpenAIEmbeddings
             from langchain_community.vectorstores import FAISS
             from langchain_community.vectorstores.faiss import DistanceStrategy
+
+            from src.rag.faiss_index import read_index
         except Exception:
             self.hybrid_disabled_reason = "langchain_faiss_dependencies_unavailable"
             return
 
         try:
-            meta_rows = _read_jsonl(meta_file)
-            if not meta_rows:
-                self.hybrid_disabled_reason = "empty_meta_rows"
-                return
-
-            index = faiss.read_index(str(index_file))
-            embeddings = OpenAIEmbeddings(model=self.cfg.embedding.model)
-
+            # meta.jsonl is only walked once, so stream it instead of holding every row.
+            meta_count = 0
             docstore_data: Dict[str, Document] = {}
             index_to_docstore_id: Dict[int, str] = {}
-            for row in meta_rows:
+            for row in iter_jsonl(meta_file):
+                meta_count += 1
                 row_idx = int(row.get("row", -1))
                 chunk_id = str(row.get("id", "")).strip()
                 if row_idx < 0 or not chunk_id:
@@ -273,11 +304,18 @@ class LangChainRAG:
                 docstore_data[chunk_id] = doc
                 index_to_docstore_id[row_idx] = chunk_id
 
-            overlap_ratio = len(docstore_data) / max(len(meta_rows), 1)
+            if not meta_count:
+                self.hybrid_disabled_reason = "empty_meta_rows"
+                return
+
+            overlap_ratio = len(docstore_data) / max(meta_count, 1)
             if overlap_ratio < self.min_faiss_chunk_overlap:
                 self.hybrid_disabled_reason = f"faiss_chunk_drift(overlap={overlap_ratio:.2f})"
                 return
 
+            index = read_index(index_file, self.cfg.index)
+            embeddings = OpenAIEmbeddings(model=self.cfg.embedding.model)
+
             if len(index_to_docstore_id) != index.ntotal:
                 self.hybrid_disabled_reason = "faiss_meta_size_mismatch"
                 return
@@ -304,35 +342,140 @@ class LangChainRAG:
         return base
 
     def _vector_hits(self, query: str, *, top_k: int) -> List[tuple[Document, float, int]]:
+        return self._vector_hits_many([query], top_k=top_k)[0]
+
+    def _context_text_for(self, metadata: Dict[str, Any], text: str) -> str:
+        chunk_id = metadata.get("chunk_id")
+        if not chunk_id:
+            return _context_text(text)
+        cached = self._context_texts.get(chunk_id)
+        if cached is None:
+            cached = self._context_texts[chunk_id] = _context_text(text)
+        return cached
+
+    def _tokens_for(self, chunk_id: str, text: str) -> frozenset[str]:
+        tokens = self._chunk_tokens.get(chunk_id)
+        if tokens is None:
+            tokens = self._chunk_tokens[chunk_id] = _token_set(text)
+        return tokens
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray | None:
+        """Query embeddings as an (n, d) float32 array, or None without a vector store."""
         if self.vector_store is None:
-            return []
-
+            return None
+
+        vectors: List[np.ndarray | None] = [self._query_vectors.get(q) for q in queries]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            embedded = self.vector_store.embedding_function.embed_documents([queries[i] for i in missing])
+            for i, vec in zip(missing, embedded):
+                arr = np.asarray(vec, dtype=np.float32)
+                self._query_vectors.put(queries[i], arr)
+                vectors[i] = arr
+        return np.vstack(vectors)
+
+    def _vector_hits_many(
+        self, queries: Sequence[str], *, top_k: int | Sequence[int]
+    ) -> List[List[tuple[Document, float, int]]]:
+        """Dense hits for several queries from one embedding call and one FAISS search per distinct k.
+
+        `top_k` is shared or given per query. Queries are grouped by k rather than searched
+        once at the largest k and sliced: with HNSW or IVF the best k of a wider search
+        need not match a search for k.
+        """
+        if self.vector_store is None or not queries:
+            return [[] for _ in queries]
+
+        ks = [top_k] * len(queries) if isinstance(top_k, int) else list(top_k)
+        by_k: Dict[int, List[int]] = {}
+        for i, k in enumerate(ks):
+            by_k.setdefault(k, []).append(i)
+
+        searched: List[tuple[np.ndarray, np.ndarray]] = [None] * len(queries)  # type: ignore[list-item]
         try:
-            hits = self.vector_store.similarity_search_with_score(query, k=top_k)
+            vectors = self.embed_queries(queries)
+            for k, idx in by_k.items():
+                group = vectors if len(idx) == len(queries) else vectors[idx]
+                scores, rows = self.vector_store.index.search(group, k)
+                for i, query_scores, query_rows in zip(idx, scores, rows):
+                    searched[i] = (query_scores, query_rows)
         except Exception:
             self.hybrid_disabled_reason = "vector_query_failed"
+            return [[] for _ in queries]
+
+        docstore = self.vector_store.docstore
+        index_to_docstore_id = self.vector_store.index_to_docstore_id
+        out: List[List[tuple[Document, float, int]]] = []
+        for query_scores, query_rows in searched:
+            hits: List[tuple[Document, float, int]] = []
+            for score, row in zip(query_scores, query_rows):
+                doc_id = index_to_docstore_id.get(int(row))
+                doc = docstore.search(doc_id) if doc_id is not None else None
+                if not isinstance(doc, Document):
+                    continue
+                hits.append((doc, _clamp01(float(score)), len(hits) + 1))
+            out.append(hits)
+        return out
+
+    def close(self) -> None:
+        self._dense_pool.shutdown(wait=False, cancel_futures=True)
+
+    def warmup(self) -> None:
+        """Run one throwaway retrieval so the first real query skips cold-start costs.
+
+        This opens the embeddings API connection and faults in the mmapped FAISS pages.
+        """
+        self.retrieve_many([("warmup", 1)])
+
+    def retrieve_many(self, queries: Sequence[tuple[str, int]]) -> List[List[Dict[str, Any]]]:
+        """Rank several (question, top_k) pairs, sharing the dense search across the batch."""
+        if not queries:
             return []
 
-        out: List[tuple[Document, float, int]] = []
-        for rank, (doc, score) in enumerate(hits, start=1):
-            try:
-                dense_score = _clamp01(float(score))
-            except Exception:
-                dense_score = 0.0
-            out.append((doc, dense_score, rank))
-        return out
+        if not self.hybrid_enabled:
+            return [self._retrieve_ranked(question, top_k=top_k) for question, top_k in queries]
 
-    def _retrieve_ranked(self, question: str, *, top_k: int) -> List[Dict[str, Any]]:
-        self.bm25_retriever.k = top_k
-        bm25_docs = self.bm25_retriever.invoke(question)
+        # The embedding round-trip runs on a worker thread while BM25 ranks on this one.
+        dense_future = self._dense_pool.submit(
+            self._vector_hits_many,
+            [question for question, _ in queries],
+            top_k=[top_k for _, top_k in queries],
+        )
+        bm25_rows = [self._bm25_rows(question, top_k) for question, top_k in queries]
+        dense_hits = dense_future.result()
+
+        return [
+            self._retrieve_ranked(question, top_k=top_k, vector_hits=dense_hits[i], bm25_rows=bm25_rows[i])
+            for i, (question, top_k) in enumerate(queries)
+        ]
+
+    def _bm25_rows(self, question: str, top_k: int) -> List[int]:
+        return self.bm25.top_n(question.split(), top_k).tolist()
+
+    def _retrieve_ranked(
+        self,
+        question: str,
+        *,
+        top_k: int,
+        vector_hits: List[tuple[Document, float, int]] | None = None,
+        bm25_rows: List[int] | None = None,
+    ) -> List[Dict[str, Any]]:
+        if self.hybrid_enabled and vector_hits is None:
+            dense_future = self._dense_pool.submit(self._vector_hits, question, top_k=top_k)
+            if bm25_rows is None:
+                bm25_rows = self._bm25_rows(question, top_k)
+            vector_hits = dense_future.result()
+        elif bm25_rows is None:
+            bm25_rows = self._bm25_rows(question, top_k)
+
+        query_tokens = _query_token_set(question)
 
         merged: Dict[str, Dict[str, Any]] = {}
 
-        for rank, doc in enumerate(bm25_docs, start=1):
-            chunk_id = str((doc.metadata or {}).get("chunk_id", "")).strip()
-            if not chunk_id:
-                continue
-            cov = _coverage(question, doc.page_content)
+        for rank, row in enumerate(bm25_rows, start=1):
+            doc = self.bm25_docs[row]
+            chunk_id = self._bm25_chunk_ids[row]
+            cov = _coverage(query_tokens, self._tokens_for(chunk_id, doc.page_content))
             entry = merged.setdefault(
                 chunk_id,
                 {
@@ -350,60 +493,57 @@ class LangChainRAG:
             entry["bm25_rank"] = rank
 
         if self.hybrid_enabled:
-            for doc, dense_score, rank in self._vector_hits(question, top_k=top_k):
+            for doc, dense_score, rank in vector_hits:
                 chunk_id = str((doc.metadata or {}).get("chunk_id", "")).strip()
                 if not chunk_id:
                     continue
-                cov = _coverage(question, doc.page_content)
-                entry = merged.setdefault(
-                    chunk_id,
-                    {
+                entry = merged.get(chunk_id)
+                if entry is None:
+                    # Coverage depends only on the chunk, so BM25 hits already carry it.
+                    entry = merged[chunk_id] = {
                         "doc": doc,
-                        "coverage": 0.0,
+                        "coverage": _coverage(query_tokens, self._tokens_for(chunk_id, doc.page_content)),
                         "bm25_score": None,
                         "dense_score": None,
                         "bm25_rank": None,
                         "dense_rank": None,
-                    },
-                )
-                entry["doc"] = entry.get("doc") or doc
-                entry["coverage"] = max(float(entry["coverage"]), cov)
+                    }
                 entry["dense_score"] = dense_score
                 entry["dense_rank"] = rank
 
-        ranked: List[Dict[str, Any]] = []
-        for chunk_id, entry in merged.items():
-            coverage = _clamp01(float(entry.get("coverage") or 0.0))
-            bm25_score = entry.get("bm25_score")
-            dense_score = entry.get("dense_score")
-            bm25_rank = entry.get("bm25_rank")
-            dense_rank = entry.get("dense_rank")
-
-            if self.hybrid_enabled:
-                bm25_component = _clamp01(float(bm25_score or 0.0))
-                dense_component = _clamp01(float(dense_score or 0.0))
-                rrf_component = 0.0
-                if isinstance(bm25_rank, int):
-                    rrf_component += 1.0 / (1.0 + bm25_rank)
-                if isinstance(dense_rank, int):
-                    rrf_component += 1.0 / (1.0 + dense_rank)
-                final_score = (0.4 * bm25_component) + (0.4 * dense_component) + (0.2 * _clamp01(rrf_component))
-            else:
-                final_score = coverage
-
-            ranked.append(
-                {
-                    "chunk_id": chunk_id,
-                    "doc": entry["doc"],
-                    "score": _clamp01(float(final_score)),
-                    "dense_score": dense_score,
-                    "bm25_score": bm25_score,
-                    "coverage": coverage,
-                }
-            )
+        if not merged:
+            return []
 
-        ranked.sort(key=lambda x: x["score"], reverse=True)
-        return ranked[:top_k]
+        entries = list(merged.values())
+        coverage = np.clip(np.fromiter((e["coverage"] or 0.0 for e in entries), np.float64, len(entries)), 0.0, 1.0)
+        if self.hybrid_enabled:
+            bm25 = np.fromiter((e["bm25_score"] or 0.0 for e in entries), np.float64, len(entries))
+            dense = np.fromiter((e["dense_score"] or 0.0 for e in entries), np.float64, len(entries))
+            # Ranks start at 1, so 0 marks "not returned by this retriever".
+            bm25_rank = np.fromiter((e["bm25_rank"] or 0 for e in entries), np.float64, len(entries))
+            dense_rank = np.fromiter((e["dense_rank"] or 0 for e in entries), np.float64, len(entries))
+            rrf = np.where(bm25_rank > 0, 1.0 / (1.0 + bm25_rank), 0.0) + np.where(
+                dense_rank > 0, 1.0 / (1.0 + dense_rank), 0.0
+            )
+            scores = 0.4 * np.clip(bm25, 0.0, 1.0) + 0.4 * np.clip(dense, 0.0, 1.0) + 0.2 * np.clip(rrf, 0.0, 1.0)
+            np.clip(scores, 0.0, 1.0, out=scores)
+        else:
+            scores = coverage
+
+        # Stable, so ties keep BM25-then-dense insertion order as before.
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        chunk_ids = list(merged)
+        return [
+            {
+                "chunk_id": chunk_ids[i],
+                "doc": entries[i]["doc"],
+                "score": float(scores[i]),
+                "dense_score": entries[i]["dense_score"],
+                "bm25_score": entries[i]["bm25_score"],
+                "coverage": float(coverage[i]),
+            }
+            for i in order
+        ]
 
     def _generate_with_retries(self, question: str, context_block: str) -> str:
         attempts = self.generation_retries + 1
@@ -423,44 +563,80 @@ class LangChainRAG:
 
         raise RuntimeError(f"generation_failed_after_retries: {last_error}")
 
-    def answer(self, question: str, *, top_k: int | None = None) -> LangChainRagResult:
-        t0 = time.perf_counter()
+    async def _agenerate_with_retries(self, question: str, context_block: str) -> str:
+        attempts = self.generation_retries + 1
+        last_error: Exception | None = None
+
+        for i in range(attempts):
+            try:
+                answer = (await self.answer_chain.ainvoke({"question": question, "context": context_block})).strip()
+                if answer:
+                    return answer
+                last_error = RuntimeError("empty_generation")
+            except Exception as e:
+                last_error = e
+
+            if i < attempts - 1:
+                await asyncio.sleep(self.generation_retry_backoff_seconds)
+
+        raise RuntimeError(f"generation_failed_after_retries: {last_error}")
+
+    def _prepare_answer(
+        self,
+        question: str,
+        *,
+        top_k: int | None,
+        retrieve: Callable[[str, int], List[Dict[str, Any]]] | None,
+        t0: float,
+    ) -> _PreparedAnswer:
         k = max(top_k or self.cfg.retrieval.top_k, 1)
 
         t_retrieval0 = time.perf_counter()
-        ranked = self._retrieve_ranked(question, top_k=k)
+        if retrieve is not None:
+            ranked = retrieve(question, k)
+        else:
+            ranked = self._retrieve_ranked(question, top_k=k)
         retrieval_seconds = time.perf_counter() - t_retrieval0
 
         fallback_reason = self.hybrid_disabled_reason if (self.cfg.retrieval.hybrid and not self.hybrid_enabled) else ""
 
         if not ranked:
-            return LangChainRagResult(
-                answer="I don't have enough information in the provided documents.",
+            return _PreparedAnswer(
+                refusal=LangChainRagResult(
+                    answer="I don't have enough information in the provided documents.",
+                    citations=[],
+                    mode=self.retrieval_mode,
+                    should_answer=False,
+                    reason=self._failure_reason("no_hits", fallback_reason),
+                    retrieval_seconds=retrieval_seconds,
+                    generation_seconds=0.0,
+                    total_seconds=time.perf_counter() - t0,
+                ),
                 citations=[],
-                mode=self.retrieval_mode,
-                should_answer=False,
-                reason=self._failure_reason("no_hits", fallback_reason),
+                context_block="",
+                fallback_reason=fallback_reason,
                 retrieval_seconds=retrieval_seconds,
-                generation_seconds=0.0,
-                total_seconds=time.perf_counter() - t0,
             )
 
         best_score = float(ranked[0]["score"])
         if best_score < self.min_score:
-            return LangChainRagResult(
-                answer="I don't have enough information in the provided documents.",
+            return _PreparedAnswer(
+                refusal=LangChainRagResult(
+                    answer="I don't have enough information in the provided documents.",
+                    citations=[],
+                    mode=self.retrieval_mode,
+                    should_answer=False,
+                    reason=self._failure_reason(f"low_confidence(best_score={best_score:.3f})", fallback_reason),
+                    retrieval_seconds=retrieval_seconds,
+                    generation_seconds=0.0,
+                    total_seconds=time.perf_counter() - t0,
+                ),
                 citations=[],
-                mode=self.retrieval_mode,
-                should_answer=False,
-                reason=self._failure_reason(f"low_confidence(best_score={best_score:.3f})", fallback_reason),
+                context_block="",
+                fallback_reason=fallback_reason,
                 retrieval_seconds=retrieval_seconds,
-                generation_seconds=0.0,
-                total_seconds=time.perf_counter() - t0,
             )
 
-        ordered_docs = [item["doc"] for item in ranked]
-        context_block = _format_context(ordered_docs)
-
         citations: List[LangChainCitation] = []
         for i, item in enumerate(ranked, start=1):
             doc = item["doc"]
@@ -475,37 +651,167 @@ class LangChainRAG:
                     dense_score=float(item["dense_score"]) if item["dense_score"] is not None else None,
                     bm25_score=float(item["bm25_score"]) if item["bm25_score"] is not None else None,
                     coverage=float(item["coverage"]),
+                    doc_id=md.get("doc_id"),
+                    url=md.get("url"),
+                    start_char=md.get("start_char"),
+                    end_char=md.get("end_char"),
+                    context_text=self._context_text_for(md, doc.page_content),
                 )
             )
 
-        t_generation0 = time.perf_counter()
-        generation_fallback_reason = ""
-        if self.disable_generation:
-            answer_text = "(generation disabled)"
-        else:
-            try:
-                answer_text = self._generate_with_retries(question=question, context_block=context_block)
-            except Exception:
-                generation_fallback_reason = "generation_unavailable"
-                answer_text = (
-                    "I found relevant context, but answer generation is temporarily unavailable. "
-                    "Please retry."
-                )
-        generation_seconds = time.perf_counter() - t_generation0
+        return _PreparedAnswer(
+            refusal=None,
+            citations=citations,
+            context_block=_format_context(citations),
+            fallback_reason=fallback_reason,
+            retrieval_seconds=retrieval_seconds,
+        )
 
+    def _finish_answer(
+        self,
+        prepared: _PreparedAnswer,
+        *,
+        answer_text: str,
+        generation_fallback_reason: str,
+        generation_seconds: float,
+        t0: float,
+    ) -> LangChainRagResult:
         final_reason = "ok"
-        if fallback_reason:
-            final_reason = f"{final_reason}(fallback={fallback_reason})"
+        if prepared.fallback_reason:
+            final_reason = f"{final_reason}(fallback={prepared.fallback_reason})"
         if generation_fallback_reason:
             final_reason = f"{final_reason};{generation_fallback_reason}"
 
         return LangChainRagResult(
             answer=answer_text,
-            citations=citations,
+            citations=prepared.citations,
             mode=self.retrieval_mode,
             should_answer=not bool(generation_fallback_reason),
             reason=final_reason,
-            retrieval_seconds=retrieval_seconds,
+            retrieval_seconds=prepared.retrieval_seconds,
             generation_seconds=generation_seconds,
             total_seconds=time.perf_counter() - t0,
         )
+
+    def answer(
+        self,
+        question: str,
+        *,
+        top_k: int | None = None,
+        retrieve: Callable[[str, int], List[Dict[str, Any]]] | None = None,
+    ) -> LangChainRagResult:
+        """Retrieve and answer one question.
+
+        `retrieve` overrides the ranking step, e.g. to route it through a batcher
+        backed by `retrieve_many`.
+        """
+        t0 = time.perf_counter()
+        prepared = self._prepare_answer(question, top_k=top_k, retrieve=retrieve, t0=t0)
+        if prepared.refusal is not None:
+            return prepared.refusal
+
+        t_generation0 = time.perf_counter()
+        generation_fallback_reason = ""
+        if self.disable_generation:
+            answer_text = "(generation disabled)"
+        else:
+            try:
+                answer_text = self._generate_with_retries(question=question, context_block=prepared.context_block)
+            except Exception:
+                generation_fallback_reason = "generation_unavailable"
+                answer_text = _GENERATION_UNAVAILABLE
+
+        return self._finish_answer(
+            prepared,
+            answer_text=answer_text,
+            generation_fallback_reason=generation_fallback_reason,
+            generation_seconds=time.perf_counter() - t_generation0,
+            t0=t0,
+        )
+
+    async def aanswer(
+        self,
+        question: str,
+        *,
+        top_k: int | None = None,
+        retrieve: Callable[[str, int], List[Dict[str, Any]]] | None = None,
+    ) -> LangChainRagResult:
+        """Async `answer`: retrieval runs in a worker thread, generation awaits the LLM's
+        async client so no thread is parked while the model decodes."""
+        t0 = time.perf_counter()
+        prepared = await asyncio.to_thread(self._prepare_answer, question, top_k=top_k, retrieve=retrieve, t0=t0)
+        if prepared.refusal is not None:
+            return prepared.refusal
+
+        t_generation0 = time.perf_counter()
+        generation_fallback_reason = ""
+        if self.disable_generation:
+            answer_text = "(generation disabled)"
+        else:
+            try:
+                answer_text = await self._agenerate_with_retries(question=question, context_block=prepared.context_block)
+            except Exception:
+                generation_fallback_reason = "generation_unavailable"
+                answer_text = _GENERATION_UNAVAILABLE
+
+        return self._finish_answer(
+            prepared,
+            answer_text=answer_text,
+            generation_fallback_reason=generation_fallback_reason,
+            generation_seconds=time.perf_counter() - t_generation0,
+            t0=t0,
+        )
+
+    def answer_stream(
+        self,
+        question: str,
+        *,
+        top_k: int | None = None,
+        retrieve: Callable[[str, int], List[Dict[str, Any]]] | None = None,
+    ) -> Iterator[str | LangChainRagResult]:
+        """Like `answer`, but yield answer text as the LLM produces it.
+
+        The last item is always the complete `LangChainRagResult`. If the stream fails
+        before producing text, this falls back to the non-streaming retry path.
+        """
+        t0 = time.perf_counter()
+        prepared = self._prepare_answer(question, top_k=top_k, retrieve=retrieve, t0=t0)
+        if prepared.refusal is not None:
+            yield prepared.refusal.answer
+            yield prepared.refusal
+            return
+
+        t_generation0 = time.perf_counter()
+        generation_fallback_reason = ""
+        parts: List[str] = []
+        if self.disable_generation:
+            parts.append("(generation disabled)")
+            yield parts[-1]
+        else:
+            try:
+                for piece in self.answer_chain.stream({"question": question, "context": prepared.context_block}):
+                    if piece:
+                        parts.append(piece)
+                        yield piece
+                if not "".join(parts).strip():
+                    raise RuntimeError("empty_generation")
+            except Exception:
+                if "".join(parts).strip():
+                    # Part of the answer already went out; report it as incomplete.
+                    generation_fallback_reason = "generation_unavailable"
+                else:
+                    try:
+                        text = self._generate_with_retries(question=question, context_block=prepared.context_block)
+                    except Exception:
+                        generation_fallback_reason = "generation_unavailable"
+                        text = _GENERATION_UNAVAILABLE
+                    parts = [text]
+                    yield text
+
+        yield self._finish_answer(
+            prepared,
+            answer_text="".join(parts).strip(),
+            generation_fallback_reason=generation_fallback_reason,
+            generation_seconds=time.perf_counter() - t_generation0,
+            t0=t0,
+        )
@@ -1,14 +1,35 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import textwrap
-from dataclasses import dataclass
-from typing import Any, Dict, List
-
+import threading
+import weakref
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Sequence
+
+import httpx
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+
+from src.core.jsonl import loads
+from src.core.settings import AppConfig, SemanticCacheConfig
+from src.rag.cache import LRUCache, SemanticCache, numeric_signature
+from src.rag.retrieve import Hit, RetrievalResult, Retriever
+
+
+# Shared keep-alive session: successive questions reuse the connection to the Ollama server.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
-from src.core.settings import AppConfig
-from src.rag.retrieve import Hit, Retriever
+
+@lru_cache(maxsize=4)
+def _get_retriever(config_path: str = "config.yaml") -> Retriever:
+    """Process-wide Retriever per config; loading re-reads FAISS + JSONL and rebuilds BM25."""
+    return Retriever(config_path=config_path)
 
 
 @dataclass(frozen=True)
@@ -18,6 +39,9 @@ class RAGResult:
     contexts: List[Hit]
 
 
+_NL_TABLE = str.maketrans("\n", " ")
+
+
 def format_context(hits: List[Hit], max_chars_per_chunk: int = 1200) -> str:
     blocks: List[str] = []
     for i, hit in enumerate(hits, start=1):
@@ -26,35 +50,62 @@ def format_context(hits: List[Hit], max_chars_per_chunk: int = 1200) -> str:
         span = f"{md.get('start_char', 0)}-{md.get('end_char', 0)}"
         url = md.get("url", "")
 
-        chunk_text = (hit.text or "").strip().replace("\n", " ")
+        chunk_text = (hit.text or "").strip()
+        # Truncate before remapping newlines so long chunks are only copied once.
         if len(chunk_text) > max_chars_per_chunk:
-            chunk_text = chunk_text[:max_chars_per_chunk].rstrip() + " ..."
+            chunk_text = chunk_text[:max_chars_per_chunk].translate(_NL_TABLE).rstrip() + " ..."
+        else:
+            chunk_text = chunk_text.translate(_NL_TABLE)
 
         blocks.append(f"[{i}] doc_id={doc_id} span={span} url={url}\n{chunk_text}\n")
 
     return "\n".join(blocks)
 
 
-def build_prompt(question: str, context_block: str) -> str:
-    return textwrap.dedent(
-        f"""
-        You are a careful assistant answering questions using ONLY the provided context.
-        If the context does not contain the answer, say: "I don't have enough information in the provided documents."
+_PROMPT_TEMPLATE = textwrap.dedent(
+    """
+    You are a careful assistant answering questions using ONLY the provided context.
+    If the context does not contain the answer, say: "I don't have enough information in the provided documents."
+
+    Rules:
+    - Use only the context below.
+    - Cite sources using bracket numbers like [1], [2] after the sentence they support.
+    - Be concise and factual.
+
+    Question:
+    {question}
 
-        Rules:
-        - Use only the context below.
-        - Cite sources using bracket numbers like [1], [2] after the sentence they support.
-        - Be concise and factual.
+    Context:
+    {context_block}
 
-        Question:
-        {question}
+    Answer:
+    """
+).strip()
 
-        Context:
-        {context_block}
 
-        Answer:
-        """
-    ).strip()
+def build_prompt(question: str, context_block: str) -> str:
+    return _PROMPT_TEMPLATE.format(question=question, context_block=context_block)
+
+
+def stream_ollama(
+    prompt: str,
+    *,
+    model: str = "llama3.1",
+    url: str = "http://localhost:11434/api/generate",
+) -> Iterator[str]:
+    """Yield response fragments from Ollama's streaming /api/generate as they arrive."""
+    payload = {"model": model, "prompt": prompt, "stream": True}
+    with _SESSION.post(url, json=payload, timeout=180, stream=True) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = loads(line)
+            piece = chunk.get("response") or ""
+            if piece:
+                yield piece
+            if chunk.get("done"):
+                break
 
 
 def call_ollama(
@@ -63,45 +114,58 @@ def call_ollama(
     model: str = "llama3.1",
     url: str = "http://localhost:11434/api/generate",
 ) -> str:
-    payload = {"model": model, "prompt": prompt, "stream": False}
-    response = requests.post(url, json=payload, timeout=180)
-    response.raise_for_status()
-    data = response.json()
-    return (data.get("response") or "").strip()
+    return "".join(stream_ollama(prompt, model=model, url=url)).strip()
 
 
-def rag_answer(
-    question: str,
-    *,
-    top_k: int | None = None,
-    llm_provider: str = "ollama",
-) -> RAGResult:
-    cfg = AppConfig.load("config.yaml")
-    retriever = Retriever()
+_NO_ANSWER = "I don't have enough information in the provided documents."
 
-    retrieval = retriever.retrieve_with_result(
-        query=question,
-        top_k=top_k or cfg.retrieval.top_k,
-        min_score=cfg.retrieval.min_score,
-    )
-    hits = retrieval.hits
+@dataclass
+class _AnswerCaches:
+    # Repeat questions skip retrieval and generation; entries expire so re-indexed docs show up.
+    exact: LRUCache[RAGResult] = field(default_factory=lambda: LRUCache(maxsize=256, ttl_seconds=3600.0))
+    # With `semantic_cache.enabled`, paraphrased repeats are answered from here too.
+    # One cache per (dimension, settings), created on first use.
+    semantic: Dict[tuple, SemanticCache[RAGResult]] = field(default_factory=dict)
 
-    if not hits or not retrieval.should_answer:
-        return RAGResult(
-            answer="I don't have enough information in the provided documents.",
-            citations=[],
-            contexts=[],
-        )
 
-    context_block = format_context(hits)
-    prompt = build_prompt(question, context_block)
+# Caches belong to a Retriever, so answers and citations from one corpus or index are
+# never served for another; they go away with the retriever.
+_CACHES: "weakref.WeakKeyDictionary[Retriever, _AnswerCaches]" = weakref.WeakKeyDictionary()
+_CACHES_LOCK = threading.Lock()
 
-    if llm_provider == "ollama":
-        model = os.getenv("OLLAMA_MODEL", "llama3.1")
-        answer = call_ollama(prompt, model=model)
-    else:
-        raise ValueError(f"Unsupported llm_provider: {llm_provider}")
 
+def _caches_for(retriever: Retriever) -> _AnswerCaches:
+    with _CACHES_LOCK:
+        caches = _CACHES.get(retriever)
+        if caches is None:
+            caches = _CACHES[retriever] = _AnswerCaches()
+        return caches
+
+
+def _semantic_cache(
+    caches: _AnswerCaches, dim: int, cfg: SemanticCacheConfig
+) -> SemanticCache[RAGResult] | None:
+    if not cfg.enabled:
+        return None
+    key = (dim, cfg.threshold, cfg.max_entries, cfg.ttl_seconds)
+    with _CACHES_LOCK:
+        cache = caches.semantic.get(key)
+        if cache is None:
+            cache = caches.semantic[key] = SemanticCache(
+                dim=dim, threshold=cfg.threshold, max_entries=cfg.max_entries, ttl_seconds=cfg.ttl_seconds
+            )
+        return cache
+
+
+def _query_vectors(retriever: Retriever, questions: Sequence[str]) -> np.ndarray | None:
+    try:
+        # Memoized by the retriever, so the dense search reuses these embeddings.
+        return retriever.embed_queries(questions)
+    except Exception:
+        return None
+
+
+def _citations(hits: List[Hit]) -> List[Dict[str, Any]]:
     citations: List[Dict[str, Any]] = []
     for i, hit in enumerate(hits, start=1):
         md = hit.metadata or {}
@@ -116,12 +180,206 @@ def rag_answer(
                 "end_char": md.get("end_char"),
             }
         )
+    return citations
+
+
+def _prompt_for(question: str, retrieval: RetrievalResult) -> str | None:
+    """Prompt for a retrieval that passed the confidence gate, else None."""
+    if not retrieval.hits or not retrieval.should_answer:
+        return None
+    return build_prompt(question, format_context(retrieval.hits))
+
+
+def _answer_tag(*, top_k: int, min_score: float, llm_provider: str, model: str) -> tuple:
+    return (llm_provider, model, top_k, min_score)
+
+
+def rag_answer_stream(
+    question: str,
+    *,
+    top_k: int | None = None,
+    llm_provider: str = "ollama",
+    cfg: AppConfig | None = None,
+    retriever: Retriever | None = None,
+) -> Iterator[str | RAGResult]:
+    """Like `rag_answer`, but yield answer text as Ollama produces it.
+
+    The last item is always the complete `RAGResult`.
+    """
+    cfg = cfg or AppConfig.load("config.yaml")
+    top_k = top_k or cfg.retrieval.top_k
+    model = os.getenv("OLLAMA_MODEL", "llama3.1")
+    tag = _answer_tag(top_k=top_k, min_score=cfg.retrieval.min_score, llm_provider=llm_provider, model=model)
+    key = (*tag, question)
+    retriever = retriever or _get_retriever()
+    caches = _caches_for(retriever)
+    cached = caches.exact.get(key)
+    if cached is not None:
+        yield cached.answer
+        yield cached
+        return
+
+    semantic = None
+    semantic_tag = (*tag, numeric_signature(question))
+    vectors = _query_vectors(retriever, [question]) if cfg.semantic_cache.enabled else None
+    if vectors is not None:
+        semantic = _semantic_cache(caches, vectors.shape[1], cfg.semantic_cache)
+        cached = semantic.get(vectors[0], tag=semantic_tag)
+        if cached is not None:
+            caches.exact.put(key, cached)
+            yield cached.answer
+            yield cached
+            return
+
+    retrieval = retriever.retrieve_with_result(
+        query=question,
+        top_k=top_k,
+        min_score=cfg.retrieval.min_score,
+    )
+    prompt = _prompt_for(question, retrieval)
+    if prompt is None:
+        result = RAGResult(answer=_NO_ANSWER, citations=[], contexts=[])
+        yield result.answer
+    elif llm_provider == "ollama":
+        parts: List[str] = []
+        for piece in stream_ollama(prompt, model=model):
+            parts.append(piece)
+            yield piece
+        result = RAGResult(answer="".join(parts).strip(), citations=_citations(retrieval.hits), contexts=retrieval.hits)
+        if semantic is not None:
+            semantic.put(vectors[0], result, tag=semantic_tag)
+    else:
+        raise ValueError(f"Unsupported llm_provider: {llm_provider}")
+
+    caches.exact.put(key, result)
+    yield result
+
+
+def rag_answer(
+    question: str,
+    *,
+    top_k: int | None = None,
+    llm_provider: str = "ollama",
+    cfg: AppConfig | None = None,
+    retriever: Retriever | None = None,
+) -> RAGResult:
+    item: str | RAGResult = ""
+    for item in rag_answer_stream(question, top_k=top_k, llm_provider=llm_provider, cfg=cfg, retriever=retriever):
+        pass
+    return item  # type: ignore[return-value]
+
+
+async def _acall_ollama(
+    prompt: str,
+    *,
+    client: httpx.AsyncClient,
+    model: str = "llama3.1",
+    url: str = "http://localhost:11434/api/generate",
+) -> str:
+    payload = {"model": model, "prompt": prompt, "stream": False}
+    response = await client.post(url, json=payload, timeout=180)
+    response.raise_for_status()
+    data = response.json()
+    return (data.get("response") or "").strip()
+
+
+async def arag_answer_many(
+    questions: Sequence[str],
+    *,
+    top_k: int | None = None,
+    llm_provider: str = "ollama",
+    cfg: AppConfig | None = None,
+    retriever: Retriever | None = None,
+) -> List[RAGResult]:
+    """`rag_answer` for several questions: one batched retrieval, then concurrent generations.
+
+    Ollama only decodes requests in parallel up to its OLLAMA_NUM_PARALLEL setting;
+    anything beyond that queues on the server.
+    """
+    if llm_provider != "ollama":
+        raise ValueError(f"Unsupported llm_provider: {llm_provider}")
+    cfg = cfg or AppConfig.load("config.yaml")
+    top_k = top_k or cfg.retrieval.top_k
+    model = os.getenv("OLLAMA_MODEL", "llama3.1")
+
+    tag = _answer_tag(top_k=top_k, min_score=cfg.retrieval.min_score, llm_provider=llm_provider, model=model)
+    keys = [(*tag, q) for q in questions]
+    retriever = retriever or await asyncio.to_thread(_get_retriever)
+    caches = _caches_for(retriever)
+    results: List[RAGResult | None] = [caches.exact.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results  # type: ignore[return-value]
+
+    semantic = None
+    if cfg.semantic_cache.enabled:
+        # Embedding and retrieval make blocking HTTP calls; keep them off the event loop.
+        vectors = await asyncio.to_thread(_query_vectors, retriever, [questions[i] for i in pending])
+        semantic = _semantic_cache(caches, vectors.shape[1], cfg.semantic_cache) if vectors is not None else None
+    if semantic is not None:
+        still_pending: List[int] = []
+        pending_vectors: List[np.ndarray] = []
+        for i, vec in zip(pending, vectors):
+            cached = semantic.get(vec, tag=(*tag, numeric_signature(questions[i])))
+            if cached is None:
+                still_pending.append(i)
+                pending_vectors.append(vec)
+            else:
+                results[i] = cached
+                caches.exact.put(keys[i], cached)
+        pending = still_pending
+        if not pending:
+            return results  # type: ignore[return-value]
+
+    retrievals = await asyncio.to_thread(
+        retriever.retrieve_many_with_result,
+        [questions[i] for i in pending],
+        top_k=top_k,
+        min_score=cfg.retrieval.min_score,
+    )
+    prompts = [_prompt_for(questions[i], r) for i, r in zip(pending, retrievals)]
+
+    async with httpx.AsyncClient(timeout=180) as client:
+        answers = await asyncio.gather(
+            *(_acall_ollama(p, client=client, model=model) for p in prompts if p is not None)
+        )
+
+    generated = iter(answers)
+    for n, (i, prompt, retrieval) in enumerate(zip(pending, prompts, retrievals)):
+        if prompt is None:
+            result = RAGResult(answer=_NO_ANSWER, citations=[], contexts=[])
+        else:
+            result = RAGResult(answer=next(generated), citations=_citations(retrieval.hits), contexts=retrieval.hits)
+            if semantic is not None:
+                semantic.put(pending_vectors[n], result, tag=(*tag, numeric_signature(questions[i])))
+        results[i] = result
+        caches.exact.put(keys[i], result)
+    return results  # type: ignore[return-value]
+
+
+async def arag_answer(
+    question: str,
+    *,
+    top_k: int | None = None,
+    llm_provider: str = "ollama",
+    cfg: AppConfig | None = None,
+    retriever: Retriever | None = None,
+) -> RAGResult:
+    """Async `rag_answer`: retrieval runs in a worker thread and the Ollama call is awaited."""
+    results = await arag_answer_many([question], top_k=top_k, llm_provider=llm_provider, cfg=cfg, retriever=retriever)
+    return results[0]
 
-    return RAGResult(answer=answer, citations=citations, contexts=hits)
+
+def rag_answer_many(questions: Sequence[str], **kwargs: Any) -> List[RAGResult]:
+    """Synchronous wrapper around `arag_answer_many` (not for use inside a running event loop)."""
+    return asyncio.run(arag_answer_many(questions, **kwargs))
 
 
 def main() -> None:
     print("RAG Answer CLI (type 'exit' to quit)\n")
+    cfg = AppConfig.load("config.yaml")
+    retriever = _get_retriever()
+
     while True:
         question = input("question> ").strip()
         if not question:
@@ -129,9 +387,14 @@ def main() -> None:
         if question.lower() in {"exit", "quit"}:
             break
 
-        result = rag_answer(question, llm_provider="ollama")
         print("\nANSWER:\n")
-        print(result.answer)
+        result: RAGResult | None = None
+        for item in rag_answer_stream(question, llm_provider="ollama", cfg=cfg, retriever=retriever):
+            if isinstance(item, RAGResult):
+                result = item
+            else:
+                print(item, end="", flush=True)
+        print()
 
         print("\nCITATIONS:")
         for c in result.citations:
@@ -1,49 +1,40 @@
 from __future__ import annotations
 
-import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
-import faiss
 import numpy as np
 from openai import OpenAI
-from rank_bm25 import BM25Okapi
 
+from src.core.batcher import MicroBatcher
+from src.core.jsonl import iter_jsonl
 from src.core.settings import AppConfig
+from src.rag.bm25 import BM25Index, top_k_indices
+from src.rag.cache import LRUCache
+from src.rag.faiss_index import read_index
 
 
 def _l2_normalize(x: np.ndarray) -> np.ndarray:
-    norms = np.linalg.norm(x, axis=1, keepdims=True) + 1e-12
-    return x / norms
+    """Scale rows of a writable float array to unit length in place."""
+    inv = 1.0 / (np.sqrt(np.einsum("ij,ij->i", x, x)) + 1e-12)
+    return np.multiply(x, inv[:, None], out=x)
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
 
 
 def _tokenize(text: str) -> List[str]:
-    return re.findall(r"[a-z0-9]+", text.lower())
+    return _TOKEN_RE.findall(text.lower())
 
 
 def _rrf(rank: int, k: int = 60) -> float:
     return 1.0 / (k + rank)
 
 
-def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    if not path.exists():
-        return rows
-    with path.open("r", encoding="utf-8") as f:
-        for line_no, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Bad JSON in {path} on line {line_no}: {e}") from e
-    return rows
-
-
 @dataclass(frozen=True)
 class Hit:
     score: float
@@ -75,6 +66,9 @@ class Retriever:
         chunks_path: str = "data/chunks/chunks.jsonl",
         config_path: str = "config.yaml",
         embedding_model: str | None = None,
+        embed_batch_size: int = 1,
+        embed_batch_wait_seconds: float = 0.01,
+        dense_workers: int = 4,
     ) -> None:
         cfg = AppConfig.load(config_path)
         if cfg.embedding.provider != "openai":
@@ -83,23 +77,44 @@ class Retriever:
         self.embedding_model = embedding_model or cfg.embedding.model
         self.default_min_score = float(cfg.retrieval.min_score)
 
-        self.meta_rows = _read_jsonl(Path(meta_path))
-        self.chunk_rows = _read_jsonl(Path(chunks_path))
+        self.meta_rows = list(iter_jsonl(meta_path, missing_ok=True))
+        self.chunk_rows = list(iter_jsonl(chunks_path, missing_ok=True))
         if not self.meta_rows and not self.chunk_rows:
             raise RuntimeError("No retrieval corpus found. Build chunks or FAISS metadata first.")
 
+        # Row-aligned with the FAISS index, so dense hits map row -> chunk id without touching row dicts.
+        self.meta_ids: List[str] = [str(r.get("id", "")).strip() for r in self.meta_rows]
         self.meta_by_id: Dict[str, Dict[str, Any]] = {
-            str(r.get("id", "")).strip(): r for r in self.meta_rows if str(r.get("id", "")).strip()
+            chunk_id: r for chunk_id, r in zip(self.meta_ids, self.meta_rows) if chunk_id
         }
         self.chunk_by_id: Dict[str, Dict[str, Any]] = {
             str(r.get("chunk_id", "")).strip(): r for r in self.chunk_rows if str(r.get("chunk_id", "")).strip()
         }
+        # Payloads for every dense row, built once; hits share these read-only dicts across queries.
+        self._payload_by_id: Dict[str, Dict[str, Any]] = {
+            chunk_id: self._build_payload(chunk_id) for chunk_id in self.meta_ids if chunk_id
+        }
 
         self.client = OpenAI() if os.getenv("OPENAI_API_KEY") else None
+        # Normalized query vectors by exact query text; repeats skip the embeddings call.
+        self._query_vectors: LRUCache[np.ndarray] = LRUCache(maxsize=1024)
+        # With embed_batch_size > 1, single-query embeddings from concurrent threads are
+        # coalesced into shared embeddings requests.
+        self._embed_batcher: MicroBatcher[str, np.ndarray] | None = None
+        if self.client is not None and embed_batch_size > 1:
+            self._embed_batcher = MicroBatcher(
+                lambda texts: list(self._embed_texts(texts)),
+                max_batch_size=embed_batch_size,
+                max_wait_seconds=embed_batch_wait_seconds,
+                name="embed-batcher",
+            )
+        # Dense lookups run here while BM25 scores on the caller's thread; one pool for
+        # all callers, threads started as needed.
+        self._dense_pool = ThreadPoolExecutor(max_workers=max(dense_workers, 1), thread_name_prefix="dense")
         self.index = None
         index_file = Path(index_path)
         if index_file.exists() and self.meta_rows:
-            self.index = faiss.read_index(str(index_file))
+            self.index = read_index(index_file, cfg.index)
             if len(self.meta_rows) != self.index.ntotal:
                 raise RuntimeError(
                     f"Meta rows ({len(self.meta_rows)}) != FAISS vectors ({self.index.ntotal}). "
@@ -131,7 +146,10 @@ class Retriever:
                 self.bm25_payloads.append(payload)
                 bm25_tokens.append(_tokenize(text))
 
-        self.bm25 = BM25Okapi(bm25_tokens) if bm25_tokens else None
+        self.bm25 = BM25Index(bm25_tokens) if bm25_tokens else None
+        self.bm25_row_by_id: Dict[str, int] = {chunk_id: i for i, chunk_id in enumerate(self.bm25_ids)}
+        # Per-row token sets for coverage, filled lazily as rows show up in results.
+        self._row_token_sets: Dict[int, frozenset[str]] = {}
 
     @staticmethod
     def _payload_from_chunk_row(row: Dict[str, Any]) -> Dict[str, Any]:
@@ -157,14 +175,41 @@ class Retriever:
             "text": str(row.get("text", "")),
         }
 
-    def _embed_query(self, query: str) -> np.ndarray:
+    def close(self) -> None:
+        self._dense_pool.shutdown(wait=False, cancel_futures=True)
+        if self._embed_batcher is not None:
+            self._embed_batcher.close()
+            self._embed_batcher = None
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray | None:
+        """Normalized query embeddings as an (n, d) float32 array, or None without dense retrieval."""
+        if self.index is None or self.client is None:
+            return None
+        return self._embed_queries(queries)
+
+    def _embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        vectors: List[np.ndarray | None] = [self._query_vectors.get(q) for q in queries]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            texts = [queries[i] for i in missing]
+            if self._embed_batcher is not None and len(texts) == 1:
+                embedded = self._embed_batcher.submit(texts[0]).reshape(1, -1)
+            else:
+                embedded = self._embed_texts(texts)
+            for i, vec in zip(missing, embedded):
+                vec = vec.copy()  # don't pin the whole batch matrix in the cache
+                self._query_vectors.put(queries[i], vec)
+                vectors[i] = vec
+        return np.vstack(vectors)
+
+    def _embed_texts(self, queries: Sequence[str]) -> np.ndarray:
         if self.client is None:
             raise RuntimeError("OPENAI_API_KEY is not set for dense retrieval.")
-        response = self.client.embeddings.create(model=self.embedding_model, input=[query])
-        vector = np.asarray(response.data[0].embedding, dtype=np.float32).reshape(1, -1)
-        return _l2_normalize(vector)
+        response = self.client.embeddings.create(model=self.embedding_model, input=list(queries))
+        vectors = np.asarray([d.embedding for d in response.data], dtype=np.float32)
+        return _l2_normalize(vectors)
 
-    def _payload_for_chunk_id(self, chunk_id: str) -> Dict[str, Any]:
+    def _build_payload(self, chunk_id: str) -> Dict[str, Any]:
         chunk_row = self.chunk_by_id.get(chunk_id)
         if chunk_row is not None:
             return self._payload_from_chunk_row(chunk_row)
@@ -175,44 +220,51 @@ class Retriever:
 
         return {"id": chunk_id, "metadata": {}, "text": ""}
 
-    def _retrieve_dense(self, query: str, *, top_k: int, min_score: float) -> Dict[str, Dict[str, Any]]:
+    def _payload_for_chunk_id(self, chunk_id: str) -> Dict[str, Any]:
+        payload = self._payload_by_id.get(chunk_id)
+        return payload if payload is not None else self._build_payload(chunk_id)
+
+    def _retrieve_dense_many(
+        self, queries: Sequence[str], *, top_k: int, min_score: float
+    ) -> List[Dict[str, Dict[str, Any]]]:
         if self.index is None or self.client is None:
-            return {}
+            return [{} for _ in queries]
 
-        q = self._embed_query(query)
+        # One embeddings request and one FAISS search for the whole batch. Every query asks
+        # for the same k, so this matches per-query searches on HNSW/IVF indexes too.
+        q = self._embed_queries(queries)
         scores, row_ids = self.index.search(q, top_k)
 
-        out: Dict[str, Dict[str, Any]] = {}
-        for rank, (score, row_id) in enumerate(zip(scores[0], row_ids[0]), start=1):
-            if row_id < 0:
-                continue
-            s = float(score)
-            if s < min_score:
-                continue
-            meta_row = self.meta_rows[int(row_id)]
-            chunk_id = str(meta_row.get("id", "")).strip()
-            if not chunk_id:
-                continue
-            out[chunk_id] = {
-                "dense_score": s,
-                "dense_rank": rank,
-                "payload": self._payload_for_chunk_id(chunk_id),
-                "row": int(row_id),
-            }
-        return out
-
-    def _retrieve_bm25(self, query: str, *, top_k: int) -> Dict[str, Dict[str, Any]]:
-        if self.bm25 is None:
-            return {}
-
-        query_tokens = _tokenize(query)
-        if not query_tokens:
+        results: List[Dict[str, Dict[str, Any]]] = []
+        for query_scores, query_rows in zip(scores, row_ids):
+            out: Dict[str, Dict[str, Any]] = {}
+            for rank, (score, row_id) in enumerate(zip(query_scores, query_rows), start=1):
+                if row_id < 0:
+                    continue
+                s = float(score)
+                if s < min_score:
+                    continue
+                chunk_id = self.meta_ids[int(row_id)]
+                if not chunk_id:
+                    continue
+                out[chunk_id] = {
+                    "dense_score": s,
+                    "dense_rank": rank,
+                    "payload": self._payload_for_chunk_id(chunk_id),
+                    "row": int(row_id),
+                }
+            results.append(out)
+        return results
+
+    def _retrieve_bm25(self, query_tokens: List[str], *, top_k: int) -> Dict[str, Dict[str, Any]]:
+        if self.bm25 is None or not query_tokens:
             return {}
 
         scores = self.bm25.get_scores(query_tokens)
-        ranked = sorted(enumerate(scores), key=lambda x: x[1], reverse=True)[:top_k]
+        ranked = top_k_indices(scores, top_k).tolist()
         out: Dict[str, Dict[str, Any]] = {}
-        for rank, (row, score) in enumerate(ranked, start=1):
+        for rank, row in enumerate(ranked, start=1):
+            score = scores[row]
             chunk_id = self.bm25_ids[row]
             out[chunk_id] = {
                 "bm25_score": float(score),
@@ -223,19 +275,25 @@ class Retriever:
         return out
 
     @staticmethod
-    def _coverage(query_tokens: List[str], text_tokens: List[str]) -> float:
+    def _coverage(query_tokens: frozenset[str], text_tokens: frozenset[str]) -> float:
         if not query_tokens:
             return 0.0
-        q = set(query_tokens)
-        if not q:
-            return 0.0
-        t = set(text_tokens)
-        return len(q & t) / len(q)
+        return len(query_tokens & text_tokens) / len(query_tokens)
+
+    def _token_set_for(self, chunk_id: str, text: str) -> frozenset[str]:
+        row = self.bm25_row_by_id.get(chunk_id)
+        # Dense-only hits can resolve to a different row text (meta vs chunks); only reuse on a match.
+        if row is None or self.bm25_payloads[row]["text"] != text:
+            return frozenset(_tokenize(text))
+        tokens = self._row_token_sets.get(row)
+        if tokens is None:
+            tokens = self._row_token_sets[row] = frozenset(_tokenize(text))
+        return tokens
 
     def _fuse_and_rerank(
         self,
         *,
-        query: str,
+        query_tokens: frozenset[str],
         dense_hits: Dict[str, Dict[str, Any]],
         bm25_hits: Dict[str, Dict[str, Any]],
         top_k: int,
@@ -248,45 +306,43 @@ class Retriever:
         if not merged:
             return []
 
-        max_dense = max((float(v.get("dense_score", 0.0)) for v in merged.values()), default=0.0) or 1.0
-        max_bm25 = max((float(v.get("bm25_score", 0.0)) for v in merged.values()), default=0.0) or 1.0
-        query_tokens = _tokenize(query)
-
-        scored: List[Hit] = []
-        for chunk_id, feats in merged.items():
-            dense_score = float(feats.get("dense_score", 0.0))
-            bm25_score = float(feats.get("bm25_score", 0.0))
-            dense_rank = int(feats.get("dense_rank", 10_000))
-            bm25_rank = int(feats.get("bm25_rank", 10_000))
-            payload = feats.get("payload", {}) or {}
-            text = str(payload.get("text", ""))
-            coverage = self._coverage(query_tokens, _tokenize(text))
-
-            rrf_score = 0.0
-            if "dense_rank" in feats:
-                rrf_score += _rrf(dense_rank)
-            if "bm25_rank" in feats:
-                rrf_score += _rrf(bm25_rank)
-
-            dense_norm = dense_score / max_dense
-            bm25_norm = bm25_score / max_bm25
-            final_score = (0.35 * rrf_score) + (0.30 * dense_norm) + (0.20 * bm25_norm) + (0.15 * coverage)
-
-            scored.append(
-                Hit(
-                    score=final_score,
-                    row=int(feats.get("row", -1)),
-                    id=chunk_id,
-                    metadata=payload.get("metadata", {}) or {},
-                    text=text,
-                    dense_score=dense_score,
-                    bm25_score=bm25_score,
-                    coverage=coverage,
-                )
+        # Gather the per-candidate features into parallel arrays and score them in one
+        # vectorized pass; Hit objects are only built for the rows that make the cut.
+        items = list(merged.items())
+        n = len(items)
+        dense = np.fromiter((float(f.get("dense_score", 0.0)) for _, f in items), dtype=np.float64, count=n)
+        bm25 = np.fromiter((float(f.get("bm25_score", 0.0)) for _, f in items), dtype=np.float64, count=n)
+        dense_rank = np.fromiter((int(f.get("dense_rank", 10_000)) for _, f in items), dtype=np.float64, count=n)
+        bm25_rank = np.fromiter((int(f.get("bm25_rank", 10_000)) for _, f in items), dtype=np.float64, count=n)
+        has_dense = np.fromiter(("dense_rank" in f for _, f in items), dtype=bool, count=n)
+        has_bm25 = np.fromiter(("bm25_rank" in f for _, f in items), dtype=bool, count=n)
+
+        payloads = [f.get("payload", {}) or {} for _, f in items]
+        texts = [str(p.get("text", "")) for p in payloads]
+        coverage = np.fromiter(
+            (self._coverage(query_tokens, self._token_set_for(cid, t)) for (cid, _), t in zip(items, texts)),
+            dtype=np.float64,
+            count=n,
+        )
+
+        max_dense = float(dense.max()) or 1.0
+        max_bm25 = float(bm25.max()) or 1.0
+        rrf_score = np.where(has_dense, _rrf(dense_rank), 0.0) + np.where(has_bm25, _rrf(bm25_rank), 0.0)
+        final = (0.35 * rrf_score) + (0.30 * (dense / max_dense)) + (0.20 * (bm25 / max_bm25)) + (0.15 * coverage)
+
+        return [
+            Hit(
+                score=float(final[i]),
+                row=int(items[i][1].get("row", -1)),
+                id=items[i][0],
+                metadata=payloads[i].get("metadata", {}) or {},
+                text=texts[i],
+                dense_score=float(dense[i]),
+                bm25_score=float(bm25[i]),
+                coverage=float(coverage[i]),
             )
-
-        scored.sort(key=lambda h: h.score, reverse=True)
-        return scored[:top_k]
+            for i in top_k_indices(final, top_k).tolist()
+        ]
 
     @staticmethod
     def _confidence_gate(hits: List[Hit], *, mode: str, min_score: float) -> tuple[bool, str]:
@@ -317,30 +373,59 @@ class Retriever:
             return False, "ambiguous_top_hit"
         return True, "ok"
 
-    def retrieve_with_result(
+    def retrieve_many_with_result(
         self,
-        query: str,
+        queries: Sequence[str],
         *,
         top_k: int = 5,
         min_score: float | None = None,
         candidate_pool: int = 25,
-    ) -> RetrievalResult:
+    ) -> List[RetrievalResult]:
+        """`retrieve_with_result` for several queries, batching the dense lookups."""
+        if not queries:
+            return []
         threshold = self.default_min_score if min_score is None else float(min_score)
-        dense = self._retrieve_dense(query, top_k=max(top_k, candidate_pool), min_score=threshold)
-        bm25 = self._retrieve_bm25(query, top_k=max(top_k, candidate_pool))
-
-        if dense and bm25:
-            mode = "hybrid"
-        elif dense:
-            mode = "dense-only"
-        elif bm25:
-            mode = "bm25-only"
+        pool = max(top_k, candidate_pool)
+        # Tokenized once per query; BM25 scoring and rerank coverage share it.
+        query_tokens = [_tokenize(query) for query in queries]
+        if self.index is not None and self.client is not None:
+            # The embedding round-trip runs on a worker thread while BM25 scores on this one.
+            dense_future = self._dense_pool.submit(self._retrieve_dense_many, queries, top_k=pool, min_score=threshold)
+            bm25_many = [self._retrieve_bm25(tokens, top_k=pool) for tokens in query_tokens]
+            dense_many = dense_future.result()
         else:
-            mode = "none"
+            dense_many = [{} for _ in queries]
+            bm25_many = [self._retrieve_bm25(tokens, top_k=pool) for tokens in query_tokens]
+
+        results: List[RetrievalResult] = []
+        for tokens, dense, bm25 in zip(query_tokens, dense_many, bm25_many):
+            if dense and bm25:
+                mode = "hybrid"
+            elif dense:
+                mode = "dense-only"
+            elif bm25:
+                mode = "bm25-only"
+            else:
+                mode = "none"
+
+            hits = self._fuse_and_rerank(
+                query_tokens=frozenset(tokens), dense_hits=dense, bm25_hits=bm25, top_k=top_k
+            )
+            should_answer, reason = self._confidence_gate(hits, mode=mode, min_score=threshold)
+            results.append(RetrievalResult(hits=hits, mode=mode, should_answer=should_answer, reason=reason))
+        return results
 
-        hits = self._fuse_and_rerank(query=query, dense_hits=dense, bm25_hits=bm25, top_k=top_k)
-        should_answer, reason = self._confidence_gate(hits, mode=mode, min_score=threshold)
-        return RetrievalResult(hits=hits, mode=mode, should_answer=should_answer, reason=reason)
+    def retrieve_with_result(
+        self,
+        query: str,
+        *,
+        top_k: int = 5,
+        min_score: float | None = None,
+        candidate_pool: int = 25,
+    ) -> RetrievalResult:
+        return self.retrieve_many_with_result(
+            [query], top_k=top_k, min_score=min_score, candidate_pool=candidate_pool
+        )[0]
 
     def retrieve(self, query: str, top_k: int = 5, min_score: float | None = None) -> List[Hit]:
         return self.retrieve_with_result(query, top_k=top_k, min_score=min_score).hits
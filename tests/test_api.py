@@ -72,3 +72,53 @@ def test_answer_generation_disabled(tmp_path: Path, monkeypatch) -> None:
     assert body["answer"] == "(generation disabled)"
     assert len(body["citations"]) >= 1
 
+
+def _stream_app(tmp_path: Path, monkeypatch):
+    chunks_path = tmp_path / "chunks.jsonl"
+    _write_jsonl(
+        chunks_path,
+        [
+            {"doc_id": "doc1", "chunk_id": "c1", "url": "https://example.com/1", "text": "SNAP helps people buy food."},
+            {"doc_id": "doc2", "chunk_id": "c2", "url": "https://example.com/2", "text": "Apply online."},
+        ],
+    )
+    monkeypatch.setenv("RAG_DISABLE_GENERATION", "true")
+    monkeypatch.setenv("REQUIRE_API_KEY", "false")
+    monkeypatch.setenv("MAX_CONCURRENT_REQUESTS", "1")
+    monkeypatch.setenv("RAG_WARMUP", "false")
+    monkeypatch.setenv("RAG_CHUNKS_PATH", str(chunks_path))
+    monkeypatch.setenv("RAG_META_PATH", str(tmp_path / "meta.jsonl"))
+    monkeypatch.setenv("RAG_INDEX_PATH", str(tmp_path / "index.faiss"))
+
+    from src.api.main import create_app
+
+    return create_app()
+
+
+def test_answer_stream_releases_its_slot(tmp_path: Path, monkeypatch) -> None:
+    with TestClient(_stream_app(tmp_path, monkeypatch)) as client:
+        # With a single slot, a second stream only succeeds if the first one gave it back.
+        for _ in range(2):
+            r = client.post("/answer/stream", json={"question": "What is SNAP?"})
+            assert r.status_code == 200
+            assert "event: token" in r.text
+            assert "event: citations" in r.text
+
+
+def test_answer_stream_releases_its_slot_when_generation_fails(tmp_path: Path, monkeypatch) -> None:
+    app = _stream_app(tmp_path, monkeypatch)
+    with TestClient(app) as client:
+        def failing_stream(question, **kwargs):
+            yield "partial"
+            raise RuntimeError("ollama went away")
+
+        engine = app.state.rag_engine
+        engine.answer_stream = failing_stream
+        try:
+            client.post("/answer/stream", json={"question": "What is SNAP?"})
+        except RuntimeError:
+            pass
+        del engine.answer_stream
+
+        r = client.post("/answer", json={"question": "What is SNAP?"})
+        assert r.status_code == 200
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from src.core.batcher import MicroBatcher
+
+
+def test_concurrent_submits_share_batches_and_keep_order() -> None:
+    calls: list[list[int]] = []
+    release = threading.Event()
+
+    def square(items: list[int]) -> list[int]:
+        release.wait(timeout=5)
+        calls.append(list(items))
+        return [i * i for i in items]
+
+    batcher = MicroBatcher(square, max_batch_size=4, max_wait_seconds=0.2)
+    results: dict[int, int] = {}
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.submit(i))) for i in range(8)]
+    try:
+        for t in threads:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join(timeout=5)
+    finally:
+        batcher.close()
+
+    assert results == {i: i * i for i in range(8)}
+    assert sum(len(c) for c in calls) == 8
+    assert len(calls) < 8
+    assert all(len(c) <= 4 for c in calls)
+
+
+def test_batch_errors_reach_every_caller() -> None:
+    def wrong_length(items: list[int]) -> list[int]:
+        return []
+
+    batcher = MicroBatcher(wrong_length, max_batch_size=2, max_wait_seconds=0.0)
+    try:
+        with pytest.raises(RuntimeError, match="batch_result_size_mismatch"):
+            batcher.submit(1)
+    finally:
+        batcher.close()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.rag.bm25 import BM25Index, top_k_indices
+from src.rag.retrieve import Retriever
+
+_CORPUS = [
+    "snap benefits help families buy food",
+    "apply for snap benefits online",
+    "income limits depend on household size",
+    "food banks and snap are different programs",
+    "the household size includes everyone who buys food together",
+]
+
+# rank_bm25 0.2.2 BM25Okapi(k1=1.5, b=0.75, epsilon=0.25) on _CORPUS; "food" is in 3 of 5
+# documents, so its idf is negative and gets the epsilon floor.
+_RANK_BM25 = {
+    "snap benefits": ([0.5854947794, 0.6303030534, 0.0, 0.2190951611, 0.0], [1, 0, 3]),
+    "household size food": ([0.2346706465, 0.0, 0.7016482659, 0.2190951611, 0.7717316036], [4, 2, 0]),
+    "unknown words": ([0.0, 0.0, 0.0, 0.0, 0.0], [4, 3, 2]),
+}
+
+
+def test_bm25_matches_rank_bm25_okapi() -> None:
+    index = BM25Index(doc.split() for doc in _CORPUS)
+
+    for query, (scores, top3) in _RANK_BM25.items():
+        np.testing.assert_allclose(index.get_scores(query.split()), scores, rtol=0, atol=1e-9)
+        assert index.top_n(query.split(), 3).tolist() == top3
+
+
+def test_top_k_indices_matches_stable_descending_sort() -> None:
+    scores = np.array([0.5, 0.9, 0.5, 0.0, 0.9, 0.5, 0.1])
+
+    for k in range(len(scores) + 2):
+        assert top_k_indices(scores, k).tolist() == np.argsort(-scores, kind="stable")[:k].tolist()
+    assert top_k_indices(scores, 3).tolist() == [1, 4, 0]
+
+
+def test_retriever_bm25_ranks_like_rank_bm25(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    chunks = tmp_path / "chunks.jsonl"
+    chunks.write_text(
+        "".join(json.dumps({"chunk_id": f"c{i}", "doc_id": f"d{i}", "text": t}) + "\n" for i, t in enumerate(_CORPUS)),
+        encoding="utf-8",
+    )
+    retriever = Retriever(
+        chunks_path=str(chunks), meta_path=str(tmp_path / "meta.jsonl"), index_path=str(tmp_path / "index.faiss")
+    )
+
+    for query, (scores, top3) in _RANK_BM25.items():
+        if not any(scores):
+            continue
+        hits = retriever._retrieve_bm25(query.split(), top_k=3)
+        assert list(hits) == [f"c{row}" for row in top3]
+        assert [h["bm25_rank"] for h in hits.values()] == [1, 2, 3]
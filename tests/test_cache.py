@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.rag import cache
+from src.rag.cache import LRUCache, SemanticCache, numeric_signature
+
+
+def _clock(monkeypatch) -> list[float]:
+    now = [100.0]
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    lru: LRUCache[int] = LRUCache(maxsize=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1  # "b" is now the oldest
+    lru.put("c", 3)
+
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c"), len(lru)) == (1, 3, 2)
+
+
+def test_lru_cache_entries_expire(monkeypatch) -> None:
+    now = _clock(monkeypatch)
+    lru: LRUCache[int] = LRUCache(maxsize=4, ttl_seconds=10.0)
+    lru.put("a", 1)
+
+    now[0] += 10.0
+    assert lru.get("a") == 1
+    now[0] += 0.5
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+def test_semantic_cache_matches_on_threshold_and_tag() -> None:
+    sem: SemanticCache[str] = SemanticCache(dim=2, threshold=0.95, max_entries=4)
+    sem.put(np.array([1.0, 0.0]), "east", tag=3)
+
+    assert sem.get(np.array([2.0, 0.1]), tag=3) == "east"  # cosine ~0.999, normalized on the way in
+    assert sem.get(np.array([1.0, 1.0]), tag=3) is None  # cosine ~0.707
+    assert sem.get(np.array([1.0, 0.0]), tag=5) is None
+
+
+def test_semantic_cache_expiry_and_eviction(monkeypatch) -> None:
+    now = _clock(monkeypatch)
+    sem: SemanticCache[str] = SemanticCache(dim=2, threshold=0.99, max_entries=2, ttl_seconds=10.0)
+    sem.put(np.array([1.0, 0.0]), "east")
+    now[0] += 1
+    sem.put(np.array([0.0, 1.0]), "north")
+    now[0] += 1
+    assert sem.get(np.array([1.0, 0.0])) == "east"  # "north" is now least recently used
+
+    now[0] += 1
+    sem.put(np.array([-1.0, 0.0]), "west")
+    assert sem.get(np.array([0.0, 1.0])) is None
+    assert sem.get(np.array([-1.0, 0.0])) == "west"
+
+    now[0] += 9.5
+    assert sem.get(np.array([1.0, 0.0])) is None  # stored 12.5s ago
+    sem.put(np.array([0.0, -1.0]), "south")  # reuses the expired slot
+    assert sem.get(np.array([-1.0, 0.0])) == "west"
+    assert len(sem) == 2
+
+
+def test_numeric_signature() -> None:
+    assert numeric_signature("income limit for 2 people in 2024") == ("2", "2024")
+    assert numeric_signature("$1,580.50 per month") == ("1,580.50",)
+    assert numeric_signature("no numbers") == ()
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import pytest
+
+from src.core.settings import ChunkingConfig
+from src.ingest.chunk import chunk_text_fixed
+
+
+def test_chunk_text_fixed_windows_cover_text() -> None:
+    text = "abcdefghij" * 10
+
+    pieces = chunk_text_fixed(text, max_chars=30, overlap_chars=10)
+
+    assert [(s, e) for _, s, e in pieces] == [(0, 30), (20, 50), (40, 70), (60, 90), (70, 100)]
+    assert all(text[s:e] == chunk for chunk, s, e in pieces)
+    assert chunk_text_fixed(text, max_chars=200, overlap_chars=10) == [(text, 0, 100)]
+
+
+def test_chunking_config_rejects_overlap_at_or_above_max() -> None:
+    with pytest.raises(ValueError, match="overlap_tokens must be < max_tokens"):
+        ChunkingConfig(method="fixed", min_tokens=10, max_tokens=100, overlap_tokens=100)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+from src.ingest.fetch import FetchRecord, _fetch_one
+
+_BODY = b"<html><body>SNAP</body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    seen: list[dict[str, str]] = []
+
+    def do_GET(self) -> None:
+        _Handler.seen.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Last-Modified", "Mon, 02 Feb 2026 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(_BODY)))
+        self.end_headers()
+        self.wfile.write(_BODY)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def test_refetch_sends_validators_and_keeps_file_on_304(tmp_path: Path) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/snap"
+    html_path = tmp_path / "doc.html"
+    kwargs = dict(url=url, doc_id="doc", html_path=html_path, pdf_path=tmp_path / "doc.pdf", timeout=5)
+
+    try:
+        with requests.Session() as session:
+            status, row = _fetch_one(session, run_id="run1", **kwargs)
+            assert status == "saved"
+            assert (row["etag"], row["last_modified"]) == ('"v1"', "Mon, 02 Feb 2026 00:00:00 GMT")
+
+            html_path.write_text("kept", encoding="utf-8")
+            status, again = _fetch_one(session, run_id="run2", prev=FetchRecord(**row), **kwargs)
+    finally:
+        server.shutdown()
+
+    assert status == "not_modified"
+    assert again == {**row, "run_id": "run2"}
+    assert html_path.read_text(encoding="utf-8") == "kept"
+    assert "If-None-Match" not in _Handler.seen[0]
+    assert _Handler.seen[1]["If-Modified-Since"] == "Mon, 02 Feb 2026 00:00:00 GMT"
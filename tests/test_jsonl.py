@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from src.core import jsonl
+from src.core.jsonl import iter_jsonl, write_jsonl
+
+
+@pytest.fixture(params=["orjson", "json"], autouse=True)
+def _parser(request, monkeypatch) -> None:
+    if request.param == "json":
+        monkeypatch.setattr(jsonl, "orjson", None)
+    elif jsonl.orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    rows = [{"id": "c1", "text": "SNAP — food"}, {"id": "c2", "n": [1, 2]}]
+    path = tmp_path / "nested" / "rows.jsonl"
+
+    assert write_jsonl(path, rows) == 2
+    assert list(iter_jsonl(path)) == rows
+
+
+def test_blank_lines_and_missing_trailing_newline(tmp_path: Path) -> None:
+    path = tmp_path / "rows.jsonl"
+    path.write_bytes(b'{"a": 1}\n\n   \n{"a": 2}\r\n\t\n{"a": 3}')
+
+    assert list(iter_jsonl(path)) == [{"a": 1}, {"a": 2}, {"a": 3}]
+
+
+def test_empty_and_missing_files(tmp_path: Path) -> None:
+    empty = tmp_path / "empty.jsonl"
+    empty.write_bytes(b"")
+
+    assert list(iter_jsonl(empty)) == []
+    assert list(iter_jsonl(tmp_path / "missing.jsonl", missing_ok=True)) == []
+    with pytest.raises(FileNotFoundError):
+        list(iter_jsonl(tmp_path / "missing.jsonl"))
+
+
+def test_invalid_line_reports_line_number(tmp_path: Path) -> None:
+    path = tmp_path / "rows.jsonl"
+    path.write_bytes(b'{"a": 1}\n\n{"a": \n')
+
+    rows = iter_jsonl(path)
+    assert next(rows) == {"a": 1}
+    with pytest.raises(ValueError, match="line 3"):
+        next(rows)
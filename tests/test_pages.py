@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+import uuid
+from pathlib import Path
+
+from src.core import logging as core_logging
+from src.ingest import pages
+
+
+class _Page:
+    def __init__(self, text: str | None) -> None:
+        self._text = text
+
+    def extract_text(self) -> str:
+        if self._text is None:
+            raise ValueError("bad xref")
+        return self._text
+
+
+class _Reader:
+    def __init__(self, path: str, strict: bool = False) -> None:
+        self.pages = [_Page(None), _Page("SNAP benefits text.")]
+
+
+def _app_log() -> Path:
+    (path,) = [p for p, h in core_logging._QUEUE_HANDLERS.items() if h in pages.logger.handlers]
+    return path
+
+
+def _log_text_with(*needles: str) -> str:
+    # The parent's records go through a QueueListener thread, so give it a moment to write them.
+    deadline = time.monotonic() + 5.0
+    while True:
+        text = _app_log().read_text(encoding="utf-8")
+        if all(n in text for n in needles) or time.monotonic() > deadline:
+            return text
+        time.sleep(0.02)
+
+
+def test_unreadable_pdf_page_is_logged_from_worker(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(pages, "fitz", None)
+    monkeypatch.setattr(pages, "PdfReader", _Reader)
+
+    pdf_dir = tmp_path / "raw" / "pdfs"
+    pdf_dir.mkdir(parents=True)
+    names = [f"doc-{uuid.uuid4().hex}" for _ in range(2)]
+    for name in names:
+        (pdf_dir / f"{name}.pdf").write_bytes(b"%PDF-1.4\n")
+
+    counts = pages.organize_all(
+        tmp_path / "raw", tmp_path / "processed", tmp_path / "organized", max_workers=2
+    )
+
+    assert counts["pdf_saved"] == 2
+    assert (tmp_path / "processed" / f"{names[0]}.txt").read_text(encoding="utf-8") == "SNAP benefits text."
+    log_text = _app_log().read_text(encoding="utf-8")
+    for name in names:
+        assert f"pdf_page_unreadable path={name}.pdf page=1" in log_text
+
+
+def test_failed_files_are_counted_and_logged_with_traceback(tmp_path: Path, monkeypatch) -> None:
+    def broken_html(path) -> str:
+        raise RuntimeError("html parser blew up")
+
+    monkeypatch.setattr(pages, "fitz", None)
+    monkeypatch.setattr(pages, "PdfReader", _Reader)
+    monkeypatch.setattr(pages, "parse_html_to_text", broken_html)
+
+    raw = tmp_path / "raw"
+    (raw / "pdfs").mkdir(parents=True)
+    html_name, pdf_name, ok_name = (f"doc-{uuid.uuid4().hex}" for _ in range(3))
+    (raw / f"{html_name}.html").write_text("<html></html>", encoding="utf-8")
+    for name in (pdf_name, ok_name):
+        (raw / "pdfs" / f"{name}.pdf").write_bytes(b"%PDF-1.4\n")
+    (tmp_path / "processed" / f"{pdf_name}.txt").mkdir(parents=True)  # the write for this PDF fails
+
+    counts = pages.organize_all(raw, tmp_path / "processed", tmp_path / "organized", max_workers=2)
+
+    assert (counts["html_failed"], counts["pdf_failed"], counts["pdf_saved"]) == (1, 1, 1)
+    log_text = _log_text_with(f"failed_html doc_id={html_name}", f"failed_pdf doc_id={pdf_name}")
+    for kind, name, error in (("html", html_name, "html parser blew up"), ("pdf", pdf_name, "IsADirectoryError")):
+        line = next(line for line in log_text.splitlines() if f"failed_{kind} doc_id={name}" in line)
+        assert error in line
+        assert "Traceback (most recent call last)" in log_text.split(line, 1)[1]
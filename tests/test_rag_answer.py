@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import numpy as np
+
+from src.core.settings import AppConfig
+from src.rag import rag_answer as ra
+from src.rag.retrieve import Hit, RetrievalResult
+
+
+class _Retriever:
+    """Every question embeds to the same vector, i.e. looks like a perfect paraphrase."""
+
+    def __init__(self, doc_id: str = "d1") -> None:
+        self.doc_id = doc_id
+
+    def embed_queries(self, questions):
+        return np.ones((len(questions), 4), dtype=np.float32)
+
+    def retrieve_with_result(self, *, query, top_k, min_score):
+        hit = Hit(score=0.9, row=0, id="c1", metadata={"doc_id": self.doc_id}, text="Income limits by household size.")
+        return RetrievalResult(hits=[hit], mode="hybrid", should_answer=True, reason="ok")
+
+
+def _answer(question: str, cfg: AppConfig, retriever: _Retriever, monkeypatch) -> ra.RAGResult:
+    monkeypatch.setattr(ra, "stream_ollama", lambda prompt, **kw: iter([f"answer to: {question}"]))
+    return ra.rag_answer(question, cfg=cfg, retriever=retriever)
+
+
+def _with_semantic_cache(cfg: AppConfig) -> AppConfig:
+    return cfg.model_copy(update={"semantic_cache": cfg.semantic_cache.model_copy(update={"enabled": True})})
+
+
+def test_semantic_cache_is_off_by_default(monkeypatch) -> None:
+    cfg = AppConfig.load("config.yaml")
+    retriever = _Retriever()
+
+    first = _answer("What is the income limit for 2 people?", cfg, retriever, monkeypatch)
+    second = _answer("What's the income limit for 2 people?", cfg, retriever, monkeypatch)
+
+    assert first.answer != second.answer
+    assert ra._caches_for(retriever).semantic == {}
+
+
+def test_semantic_cache_keeps_questions_with_different_numbers_apart(monkeypatch) -> None:
+    cfg = _with_semantic_cache(AppConfig.load("config.yaml"))
+    retriever = _Retriever()
+
+    two = _answer("What is the income limit for 2 people?", cfg, retriever, monkeypatch)
+    three = _answer("What is the income limit for 3 people?", cfg, retriever, monkeypatch)
+    paraphrase = _answer("What's the income limit for 2 people?", cfg, retriever, monkeypatch)
+
+    assert two.answer == "answer to: What is the income limit for 2 people?"
+    assert three.answer == "answer to: What is the income limit for 3 people?"
+    assert paraphrase.answer == two.answer
+
+
+def test_answer_caches_are_per_retriever(monkeypatch) -> None:
+    cfg = _with_semantic_cache(AppConfig.load("config.yaml"))
+    question = "What is the income limit for 2 people?"
+
+    first = _answer(question, cfg, _Retriever("corpus-a"), monkeypatch)
+    other = _answer(question, cfg, _Retriever("corpus-b"), monkeypatch)
+
+    assert first.citations[0]["doc_id"] == "corpus-a"
+    assert other.citations[0]["doc_id"] == "corpus-b"
+
+
+def test_arag_answer_keeps_the_event_loop_free(monkeypatch) -> None:
+    class SlowRetriever(_Retriever):
+        def retrieve_many_with_result(self, queries, *, top_k, min_score):
+            time.sleep(0.3)  # stands in for the blocking embeddings + FAISS round-trip
+            return [self.retrieve_with_result(query=q, top_k=top_k, min_score=min_score) for q in queries]
+
+    async def fake_ollama(prompt, *, client, model):
+        return "ok"
+
+    monkeypatch.setattr(ra, "_acall_ollama", fake_ollama)
+
+    async def run() -> tuple[ra.RAGResult, int]:
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        result = await ra.arag_answer("What is SNAP?", cfg=AppConfig.load("config.yaml"), retriever=SlowRetriever())
+        ticker.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(run())
+    assert result.answer == "ok"
+    assert ticks >= 10